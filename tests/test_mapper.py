@@ -0,0 +1,61 @@
+"""Tests for tracker.mapper."""
+
+import gc
+import tempfile
+import unittest
+import weakref
+from pathlib import Path
+
+from tracker import mapper
+from tracker.mapper import TaskMapper
+
+
+class MapperTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.config_path = str(self.dir / "config.yaml")
+
+
+class ExitFlushTest(MapperTestCase):
+    def test_dropped_mapper_is_not_kept_alive(self):
+        ref = weakref.ref(TaskMapper(self.config_path))
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_live_mappers_are_flushed_at_exit(self):
+        task_mapper = TaskMapper(self.config_path)
+        task_mapper.learn_correction({"app": "Code", "title": "billing service"}, "PROJ-1")
+        self.assertTrue(task_mapper.journal_path.exists())
+
+        mapper._flush_live_mappers()
+
+        self.assertFalse(task_mapper.journal_path.exists())
+        self.assertTrue(task_mapper.learned_path.exists())
+
+
+class ReplayJournalTest(MapperTestCase):
+    def test_corrupt_lines_are_skipped(self):
+        journal = self.dir / mapper.LEARNED_JOURNAL_PATH
+        journal.write_text(
+            '{"op": "upsert", "index": 0, "pattern": null}\n'
+            '{"op": "upsert", "index": 0, "pattern": "Code"}\n'
+            '{"op": "upsert", "index": 0, "pattern": ["Code"]}\n'
+            '{"op": "upsert", "index": -1, "pattern": {"app_contains": "code"}}\n'
+            '{"op": "upsert", "index": "0", "pattern": {"app_contains": "code"}}\n'
+            'not json\n'
+            '{"op": "upsert", "index": 0, "pattern": {"app_contains": "code", "task_key": "PROJ-1"}}\n'
+            '{"op": "upsert", "index": 1, "pattern": null}\n',
+            encoding="utf-8",
+        )
+
+        with self.assertLogs(mapper.logger, "WARNING") as logs:
+            task_mapper = TaskMapper(self.config_path)
+
+        self.assertEqual(len(logs.records), 7)
+        self.assertEqual(task_mapper.learned["patterns"], [{"app_contains": "code", "task_key": "PROJ-1"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
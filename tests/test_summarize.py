@@ -0,0 +1,93 @@
+"""Tests for tracker.summarize."""
+
+import io
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from tracker import summarize
+from tracker.summarize import ActivityBlock, ActivitySummarizer, JsonValueTracker
+
+
+def _feed_all(tracker: JsonValueTracker, chunks: list[str]) -> bool:
+    return any(tracker.feed(chunk) for chunk in chunks)
+
+
+class JsonValueTrackerTest(unittest.TestCase):
+    def test_closes_on_array(self):
+        tracker = JsonValueTracker()
+        self.assertTrue(_feed_all(tracker, ['[{"a": "]"}', ", {}]", " trailing"]))
+        self.assertEqual(tracker.pos, len('[{"a": "]"}, {}]'))
+
+    def test_skips_bracketed_preamble(self):
+        reply = 'Here are the sessions [as requested]:\n[{"task": "X-1"}]'
+        for size in (1, 7, len(reply)):
+            with self.subTest(chunk_size=size):
+                tracker = JsonValueTracker()
+                chunks = [reply[i:i + size] for i in range(0, len(reply), size)]
+                self.assertTrue(_feed_all(tracker, chunks))
+                self.assertEqual(tracker.pos, len(reply))
+
+    def test_unclosed_value_is_not_done(self):
+        tracker = JsonValueTracker()
+        self.assertFalse(_feed_all(tracker, ["[note] ", '[{"task": "X-1"}']))
+
+
+class ParseLinesTest(unittest.TestCase):
+    def test_invalid_utf8_line_is_skipped(self):
+        lines = [b'{"app": "Code"}', b'{"app": "\xff"}', b'{"app": "Slack"}']
+        for has_orjson in {False, summarize.HAS_ORJSON}:
+            with self.subTest(has_orjson=has_orjson), \
+                    mock.patch.object(summarize, "HAS_ORJSON", has_orjson), \
+                    self.assertLogs(summarize.logger, "WARNING"):
+                entries = list(ActivitySummarizer()._parse_lines(lines, Path("log.jsonl")))
+            self.assertEqual([entry["app"] for entry in entries], ["Code", "Slack"])
+
+
+class GenerateHttpTest(unittest.TestCase):
+    def test_bracketed_preamble_reads_whole_answer(self):
+        reply = 'Here are the sessions [as requested]:\n[{"task": "X-1"}]'
+        lines = [
+            json.dumps({"message": {"content": reply[i:i + 5]}}).encode("utf-8") + b"\n"
+            for i in range(0, len(reply), 5)
+        ]
+        lines.append(json.dumps({"message": {"content": "ignored"}, "done": True}).encode("utf-8") + b"\n")
+        response = io.BytesIO(b"".join(lines))
+
+        summarizer = ActivitySummarizer(use_cache=False)
+        with mock.patch.object(summarize.urllib.request, "urlopen", return_value=response):
+            text = summarizer._generate_http("prompt", num_predict=64)
+
+        self.assertEqual(text, reply)
+        self.assertEqual(summarizer.parse_llm_response(text), [{"task": "X-1"}])
+
+
+class SummarizeBatchTest(unittest.TestCase):
+    def test_one_request_with_batch_instructions(self):
+        block = ActivityBlock(datetime(2024, 1, 15, 9, 0), "Code", "main.py")
+        block.end_time = datetime(2024, 1, 15, 10, 0)
+        dates = ["2024-01-15", "2024-01-16"]
+        reply = json.dumps({
+            date: [{"from": "09:00", "to": "10:00", "summary": f"Coding on {date}"}] for date in dates
+        })
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            summarizer = ActivitySummarizer(data_dir=data_dir, use_cache=False)
+            with mock.patch.object(summarizer, "load_blocks", return_value=([block], 1)), \
+                    mock.patch.object(summarizer, "call_llm", return_value=reply) as call_llm:
+                results = summarizer.summarize_batch(dates)
+
+        call_llm.assert_called_once()
+        prompt = call_llm.call_args.args[0]
+        self.assertEqual(call_llm.call_args.kwargs["system_prompt"], summarize._BATCH_SYSTEM_PROMPT)
+        self.assertNotIn("JSON response:", prompt)
+        self.assertEqual(prompt.count("Block 1:"), 2)
+        self.assertEqual([result["summary"][0]["summary"] for result in results],
+                         ["Coding on 2024-01-15", "Coding on 2024-01-16"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Tests for tracker.utils."""
+
+import subprocess
+import unittest
+from unittest import mock
+
+from tracker import utils
+
+
+class _NoWorker:
+    available = False
+
+
+class GetActiveContextTest(unittest.TestCase):
+    def setUp(self):
+        utils._last_context = None
+        utils._last_context_at = 0.0
+        self.addCleanup(setattr, utils, "_last_context", None)
+
+    def _context_for(self, stdout: str) -> dict:
+        completed = subprocess.CompletedProcess([], 0, stdout=stdout, stderr="")
+        with mock.patch.object(utils._OSAWorker, "instance", return_value=_NoWorker()), \
+                mock.patch.object(utils, "_compiled_script", return_value=None), \
+                mock.patch.object(utils.subprocess, "run", return_value=completed):
+            return utils.get_active_context()
+
+    def test_empty_bundle_id_keeps_field_order(self):
+        context = self._context_for("\x1fJava\x1fMyApp - main window\x1f\n")
+        self.assertEqual(context, {
+            "app": None,
+            "name": "Java",
+            "title": "MyApp - main window",
+            "url": None,
+        })
+
+    def test_all_fields(self):
+        context = self._context_for("com.google.Chrome\x1fGoogle Chrome\x1fInbox\x1fhttps://mail.example.com/\n")
+        self.assertEqual(context["app"], "com.google.Chrome")
+        self.assertEqual(context["title"], "Inbox")
+        self.assertEqual(context["url"], "https://mail.example.com/")
+
+
+class ContextScriptTest(unittest.TestCase):
+    def test_url_scripts_cover_browser_handlers(self):
+        scripted = set(utils.BROWSER_HANDLERS) - {"Firefox"}
+        self.assertLessEqual(scripted, set(utils.CONTEXT_URL_SCRIPTS))
+
+
+if __name__ == "__main__":
+    unittest.main()
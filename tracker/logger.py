@@ -11,23 +11,25 @@ import logging
 import os
 import signal
 import sys
+import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
-from tracker.utils import (
-    get_active_app_name,
-    get_active_window_title,
-    get_all_apps_with_windows,
-    get_browser_url,
-    is_browser,
-)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+from tracker.utils import get_active_context, get_all_apps_with_windows
 
 # Default configuration
 DEFAULT_INTERVAL = 300  # 5 minutes
 DEFAULT_DATA_DIR = "data"
 DEFAULT_WORK_HOURS = (8, 18)  # 8:00 to 18:00
+MAX_OFF_HOURS_WAIT = 3600  # Re-check at least hourly (clock changes, sleep/wake)
 
 # Setup logging
 logging.basicConfig(
@@ -38,6 +40,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def encode_entry(entry: dict) -> bytes:
+    """Serialize an entry as one UTF-8 JSONL line, using orjson when installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(entry) + b"\n"
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+
 class ActivityLogger:
     """Logs user activity to daily JSONL files."""
 
@@ -62,22 +71,39 @@ class ActivityLogger:
         self.work_hours = work_hours
         self.skip_weekends = skip_weekends
         self.running = False
+        self._stop_event = threading.Event()
+        self._wt_cache_until = 0.0
+        self._wt_cache_val = True
+        self._log_fd: Optional[int] = None
+        self._log_date: Optional[str] = None
         self._ensure_data_dir()
 
     def _ensure_data_dir(self) -> None:
         """Create the data directory if it doesn't exist."""
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Data directory: {self.data_dir.absolute()}")
+        logger.info("Data directory: %s", self.data_dir.absolute())
 
     def _is_work_time(self) -> bool:
         """
         Check if current time is within configured work hours.
 
+        The answer only depends on weekday and hour, so it is cached until
+        the next local hour boundary.
+
         Returns:
             True if logging should occur, False if outside work hours
         """
+        if time.time() < self._wt_cache_until:
+            return self._wt_cache_val
+
         now = datetime.now()
+        next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        self._wt_cache_until = next_hour.timestamp()
+        self._wt_cache_val = self._compute_is_work_time(now)
+        return self._wt_cache_val
 
+    def _compute_is_work_time(self, now: datetime) -> bool:
+        """Evaluate the weekend and work-hours rules for a given time."""
         # Check weekend
         if self.skip_weekends and now.weekday() >= 5:  # Saturday=5, Sunday=6
             return False
@@ -90,6 +116,24 @@ class ActivityLogger:
 
         return True
 
+    def _seconds_until_work_window(self) -> float:
+        """
+        Get the number of seconds until the next work window starts.
+
+        Returns:
+            Seconds until the next start hour on a day that is not skipped
+        """
+        now = datetime.now()
+        start_hour = self.work_hours[0] if self.work_hours else 0
+
+        next_start = now.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+        if next_start <= now:
+            next_start += timedelta(days=1)
+        while self.skip_weekends and next_start.weekday() >= 5:
+            next_start += timedelta(days=1)
+
+        return (next_start - now).total_seconds()
+
     def _get_log_path(self, date: Optional[datetime] = None) -> Path:
         """
         Get the path to the log file for a given date.
@@ -113,8 +157,10 @@ class ActivityLogger:
             Dictionary containing timestamp, app, title, and optionally URL
         """
         timestamp = datetime.now().isoformat()
-        app_name = get_active_app_name()
-        window_title = get_active_window_title()
+        # One osascript call covers the app, window title and browser URL
+        context = get_active_context()
+        app_name = context["name"]
+        window_title = context["title"]
 
         entry = {
             "ts": timestamp,
@@ -122,11 +168,9 @@ class ActivityLogger:
             "title": window_title or "",
         }
 
-        # Capture browser URL if applicable
-        if app_name and is_browser(app_name):
-            url = get_browser_url(app_name)
-            if url:
-                entry["url"] = url
+        # Browser URL, fetched by the same script as the title
+        if context["url"]:
+            entry["url"] = context["url"]
 
         # Capture all apps with open windows
         all_apps = get_all_apps_with_windows()
@@ -138,6 +182,23 @@ class ActivityLogger:
 
         return entry
 
+    def _get_log_fd(self) -> int:
+        """
+        Get the open descriptor for today's log file, rotating on date change.
+
+        Returns:
+            O_APPEND file descriptor for the current daily log
+        """
+        now = datetime.now()
+        date_str = now.strftime("%Y-%m-%d")
+        if self._log_fd is None or date_str != self._log_date:
+            self.close()
+            self._log_fd = os.open(
+                self._get_log_path(now), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+            )
+            self._log_date = date_str
+        return self._log_fd
+
     def write_entry(self, entry: dict) -> None:
         """
         Write an activity entry to the daily log file.
@@ -145,13 +206,22 @@ class ActivityLogger:
         Args:
             entry: Activity entry dictionary
         """
-        log_path = self._get_log_path()
         try:
-            with open(log_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-            logger.debug(f"Logged: {entry['app']} - {entry['title'][:50]}...")
-        except IOError as e:
-            logger.error(f"Failed to write log entry: {e}")
+            # One write(2) per entry; O_APPEND makes each line an atomic append
+            os.write(self._get_log_fd(), encode_entry(entry))
+            logger.debug("Logged: %s - %.50s...", entry["app"], entry["title"])
+        except OSError as e:
+            logger.error("Failed to write log entry: %s", e)
+
+    def close(self) -> None:
+        """Close the current log file descriptor."""
+        if self._log_fd is not None:
+            try:
+                os.close(self._log_fd)
+            except OSError as e:
+                logger.error("Failed to close log file: %s", e)
+            self._log_fd = None
+            self._log_date = None
 
     def log_once(self) -> dict:
         """
@@ -167,13 +237,21 @@ class ActivityLogger:
     def run(self) -> None:
         """Run the activity logger continuously."""
         self.running = True
-        logger.info(f"Starting activity logger (interval: {self.interval}s)")
+        self._stop_event.clear()
+        logger.info("Starting activity logger (interval: %ss)", self.interval)
         if self.work_hours:
-            logger.info(f"Work hours: {self.work_hours[0]:02d}:00 - {self.work_hours[1]:02d}:00")
+            logger.info("Work hours: %02d:00 - %02d:00", *self.work_hours)
         if self.skip_weekends:
             logger.info("Skipping weekends")
         logger.info("Press Ctrl+C to stop")
 
+        try:
+            self._run_loop()
+        finally:
+            self.close()
+
+    def _run_loop(self) -> None:
+        """Capture snapshots until stopped."""
         outside_hours_logged = False
 
         while self.running:
@@ -182,38 +260,46 @@ class ActivityLogger:
                 if not outside_hours_logged:
                     logger.info("Outside work hours - paused (still running, will resume automatically)")
                     outside_hours_logged = True
-                time.sleep(60)  # Check every minute when outside work hours
+                # Sleep until the next work window (capped for safety)
+                wait = min(MAX_OFF_HOURS_WAIT, max(1.0, self._seconds_until_work_window()))
+                if self._stop_event.wait(wait):
+                    break
                 continue
 
             outside_hours_logged = False  # Reset when back in work hours
 
             try:
                 entry = self.log_once()
-                app_display = entry.get("app", "Unknown")
-                title_display = entry.get("title", "")[:40]
-                url_display = entry.get("url", "")[:30] if "url" in entry else ""
-
-                status = f"[{entry['ts'][:19]}] {app_display}"
-                if title_display:
-                    status += f" | {title_display}"
-                if url_display:
-                    status += f" | {url_display}..."
-
-                logger.info(status)
+                # Only build the status line when INFO is actually emitted
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(self._format_status(entry))
 
             except Exception as e:
-                logger.error(f"Error capturing activity: {e}")
-
-            # Sleep in smaller increments for responsive shutdown
-            sleep_time = self.interval
-            while sleep_time > 0 and self.running:
-                time.sleep(min(1, sleep_time))
-                sleep_time -= 1
+                logger.error("Error capturing activity: %s", e)
+
+            # Wait for the next snapshot; returns early when stop() is called
+            if self._stop_event.wait(self.interval):
+                break
+
+    @staticmethod
+    def _format_status(entry: dict) -> str:
+        """Format a one-line console status for a logged entry."""
+        app_display = entry.get("app", "Unknown")
+        title_display = entry.get("title", "")[:40]
+        url_display = entry.get("url", "")[:30] if "url" in entry else ""
+
+        status = f"[{entry['ts'][:19]}] {app_display}"
+        if title_display:
+            status += f" | {title_display}"
+        if url_display:
+            status += f" | {url_display}..."
+        return status
 
     def stop(self) -> None:
         """Stop the activity logger."""
         logger.info("Stopping activity logger...")
         self.running = False
+        self._stop_event.set()
 
 
 def setup_signal_handlers(tracker: ActivityLogger) -> None:
@@ -294,6 +380,7 @@ def main():
 
     if args.once:
         entry = tracker.log_once()
+        tracker.close()
         print(json.dumps(entry, indent=2))
     else:
         setup_signal_handlers(tracker)
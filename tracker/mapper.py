@@ -3,24 +3,68 @@
 Task Mapper - Maps activity blocks to Jira tasks using patterns and learning.
 """
 
+import atexit
+import functools
 import json
 import logging
 import os
+import re
+import time
+import weakref
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
+from urllib.parse import urlparse
 
 try:
     import yaml
     HAS_YAML = True
+    # Prefer the libyaml C bindings when PyYAML was built with them
+    try:
+        from yaml import CSafeLoader as YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as YamlLoader
 except ImportError:
     HAS_YAML = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_CONFIG_PATH = "config.yaml"
 LEARNED_PATTERNS_PATH = "learned_patterns.yaml"
+LEARNED_JOURNAL_PATH = "learned_patterns.jsonl"  # Append-only log of pattern changes
 CONFIDENCE_THRESHOLD = 5  # Auto-apply after 5 successful matches
+COMPACT_INTERVAL_SECONDS = 60.0  # Minimum time between snapshot rewrites
+CONFIG_STAT_INTERVAL_SECONDS = 2.0  # Minimum time between config mtime checks
+
+# Pattern constraint fields, in the order of the compiled predicate tuple
+PATTERN_FIELDS = ("app_contains", "title_contains", "url_contains", "app_equals")
+
+# Words never used as a learned title pattern
+_STOPWORDS = frozenset({"the", "and", "for"})
+_WORD_RE = re.compile(r"\S+")
+
+# Mappers flushed at interpreter exit. Weak references, so a mapper dropped
+# early is not kept alive; its changes are already in the journal.
+_live_mappers: "weakref.WeakSet[TaskMapper]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_mappers() -> None:
+    """Compact the pending changes of every mapper still alive at exit."""
+    for mapper in list(_live_mappers):
+        mapper.flush()
+
+
+@functools.lru_cache(maxsize=1024)
+def _netloc_of(url: str) -> str:
+    """Return the network location of a URL (memoized, URLs repeat daily)."""
+    return urlparse(url).netloc
 
 
 class TaskMapper:
@@ -29,8 +73,19 @@ class TaskMapper:
     def __init__(self, config_path: str = DEFAULT_CONFIG_PATH):
         self.config_path = Path(config_path)
         self.learned_path = self.config_path.parent / LEARNED_PATTERNS_PATH
-        self.config = self._load_config()
+        self.journal_path = self.config_path.parent / LEARNED_JOURNAL_PATH
+        self._config_mtime = self._get_config_mtime()
+        self._last_stat = time.time()
+        self.reload_config()
         self.learned = self._load_learned_patterns()
+        replayed = self._replay_journal()
+        self._compile_learned_patterns()
+        self._dirty = False
+        self._last_save = time.time()
+        if replayed:
+            # Fold the journal left by a previous run into the snapshot
+            self._save_learned_patterns()
+        _live_mappers.add(self)
 
     def _get_default_config(self) -> dict:
         """Return default configuration when no config file exists."""
@@ -58,7 +113,7 @@ class TaskMapper:
 
         try:
             with open(self.config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f) or {}
+                config = yaml.load(f, Loader=YamlLoader) or {}
                 # Merge with defaults
                 defaults = self._get_default_config()
                 for key, value in defaults.items():
@@ -69,65 +124,218 @@ class TaskMapper:
             logger.error(f"Failed to load config: {e}")
             return self._get_default_config()
 
+    def _get_config_mtime(self) -> float:
+        """Get the config file's modification time, or 0.0 if it is missing."""
+        try:
+            return self.config_path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def reload_config(self) -> None:
+        """Load the config file and rebuild everything derived from it."""
+        self.config = self._load_config()
+        self._compile_config_patterns()
+        self._cache_config_values()
+
+    def _maybe_reload(self) -> None:
+        """Reload the config if its mtime changed, checking at most every few seconds."""
+        now = time.time()
+        if now - self._last_stat < CONFIG_STAT_INTERVAL_SECONDS:
+            return
+        self._last_stat = now
+
+        mtime = self._get_config_mtime()
+        if mtime != self._config_mtime:
+            self._config_mtime = mtime
+            logger.info(f"Config changed, reloading: {self.config_path}")
+            self.reload_config()
+
     def _load_learned_patterns(self) -> dict:
-        """Load learned patterns from YAML/JSON file."""
+        """Load learned patterns from JSON file (YAML accepted for older files)."""
         if not self.learned_path.exists():
             return {"patterns": [], "corrections": []}
 
         try:
-            with open(self.learned_path, "r", encoding="utf-8") as f:
-                if HAS_YAML:
-                    return yaml.safe_load(f) or {"patterns": [], "corrections": []}
-                else:
-                    # Try JSON as fallback
-                    return json.load(f)
+            text = self.learned_path.read_text(encoding="utf-8")
+            try:
+                return json.loads(text) or {"patterns": [], "corrections": []}
+            except json.JSONDecodeError:
+                if not HAS_YAML:
+                    raise
+                # Written by a version that saved real YAML
+                return yaml.load(text, Loader=YamlLoader) or {"patterns": [], "corrections": []}
         except Exception as e:
             logger.warning(f"Failed to load learned patterns: {e}")
             return {"patterns": [], "corrections": []}
 
+    def _replay_journal(self) -> int:
+        """
+        Apply journaled pattern upserts on top of the loaded snapshot.
+
+        Returns:
+            Number of journal records applied
+        """
+        if not self.journal_path.exists():
+            return 0
+
+        patterns = self.learned.setdefault("patterns", [])
+        applied = 0
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line_num, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        index = record["index"]
+                        pattern = record["pattern"]
+                        if not isinstance(index, int) or isinstance(index, bool) or index < 0:
+                            raise TypeError(f"bad index {index!r}")
+                        if not isinstance(pattern, dict):
+                            raise TypeError(f"bad pattern {pattern!r}")
+                    except (json.JSONDecodeError, KeyError, TypeError) as e:
+                        logger.warning(f"Skipping invalid journal line {line_num}: {e}")
+                        continue
+                    if index < len(patterns):
+                        patterns[index] = pattern
+                    else:
+                        patterns.append(pattern)
+                    applied += 1
+        except IOError as e:
+            logger.warning(f"Failed to read learned pattern journal: {e}")
+
+        return applied
+
+    def _append_journal(self, index: int) -> None:
+        """Append the current state of one learned pattern to the journal."""
+        record = {"op": "upsert", "index": index, "pattern": self.learned["patterns"][index]}
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except IOError as e:
+            logger.error(f"Failed to journal learned pattern: {e}")
+
     def _save_learned_patterns(self) -> None:
-        """Save learned patterns to YAML/JSON file."""
+        """
+        Save learned patterns and truncate the journal.
+
+        The snapshot is written as indented JSON, which YAML parsers also
+        read, so the .yaml file stays hand-editable and backward compatible.
+        """
+        tmp_path = self.learned_path.with_name(self.learned_path.name + ".tmp")
         try:
-            with open(self.learned_path, "w", encoding="utf-8") as f:
-                if HAS_YAML:
-                    yaml.dump(self.learned, f, default_flow_style=False, allow_unicode=True)
-                else:
-                    json.dump(self.learned, f, indent=2)
+            if HAS_ORJSON:
+                data = orjson.dumps(self.learned, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(self.learned, indent=2, ensure_ascii=False).encode("utf-8")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self.learned_path)
+            self.journal_path.unlink(missing_ok=True)
+            self._dirty = False
+            self._last_save = time.time()
         except Exception as e:
             logger.error(f"Failed to save learned patterns: {e}")
 
-    def _pattern_matches(self, pattern: dict, entry: dict) -> bool:
-        """Check if a pattern matches an entry."""
-        app = entry.get("app", "").lower()
-        title = entry.get("title", "").lower()
-        url = entry.get("url", "").lower()
-
-        # Check app_contains
-        if "app_contains" in pattern:
-            if pattern["app_contains"].lower() not in app:
-                return False
-
-        # Check title_contains
-        if "title_contains" in pattern:
-            if pattern["title_contains"].lower() not in title:
-                return False
-
-        # Check url_contains
-        if "url_contains" in pattern:
-            if pattern["url_contains"].lower() not in url:
-                return False
-
-        # Check app_equals
-        if "app_equals" in pattern:
-            if pattern["app_equals"].lower() != app:
-                return False
-
-        return True
-
-    def _find_learned_match(self, entry: dict) -> Optional[dict]:
-        """Find a matching learned pattern."""
-        for pattern in self.learned.get("patterns", []):
-            if self._pattern_matches(pattern, entry):
+    def _mark_dirty(self, index: int) -> None:
+        """Journal a changed pattern, compacting into the snapshot when due."""
+        self._append_journal(index)
+        self._dirty = True
+        if time.time() - self._last_save > COMPACT_INTERVAL_SECONDS:
+            self._save_learned_patterns()
+
+    def flush(self) -> None:
+        """Compact pending learned-pattern changes into the snapshot file."""
+        if self._dirty:
+            self._save_learned_patterns()
+
+    @staticmethod
+    def _compile_pattern(pattern: dict) -> tuple[Optional[str], ...]:
+        """Lowercase a pattern's constraints into a tuple ordered as PATTERN_FIELDS."""
+        return tuple(
+            pattern[field].lower() if field in pattern else None
+            for field in PATTERN_FIELDS
+        )
+
+    def _compile_config_patterns(self) -> None:
+        """Precompile client patterns from config as (predicates, pattern, client)."""
+        self._config_patterns = [
+            (self._compile_pattern(pattern), pattern, client)
+            for client in self.config.get("clients", [])
+            for pattern in client.get("patterns", [])
+        ]
+        self._config_by_app: dict[str, list[int]] = {}
+
+        # (client name, task key) -> task name, first definition wins
+        self._task_name_by_client_key: dict[tuple[str, str], str] = {}
+        for client in self.config.get("clients", []):
+            client_name = client.get("name", "Unknown")
+            for task in client.get("tasks", []):
+                self._task_name_by_client_key.setdefault(
+                    (client_name, task.get("key")), task.get("name", "")
+                )
+
+    def _compile_learned_patterns(self) -> None:
+        """Precompile learned patterns as (predicates, pattern)."""
+        self._learned_patterns = [
+            (self._compile_pattern(pattern), pattern)
+            for pattern in self.learned.get("patterns", [])
+        ]
+        self._learned_by_app: dict[str, list[int]] = {}
+
+    @staticmethod
+    def _lowercase_entry(entry: dict) -> tuple[str, str, str]:
+        """Lowercase the matchable fields of an entry as (app, title, url)."""
+        return (
+            entry.get("app", "").lower(),
+            entry.get("title", "").lower(),
+            entry.get("url", "").lower(),
+        )
+
+    def _pattern_matches(self, compiled: tuple[Optional[str], ...], lc: tuple[str, str, str]) -> bool:
+        """Check if a compiled pattern matches a lowercased (app, title, url) entry."""
+        # None marks an unused constraint; short-circuits on the first failure
+        return (
+            (compiled[0] is None or compiled[0] in lc[0])
+            and (compiled[1] is None or compiled[1] in lc[1])
+            and (compiled[2] is None or compiled[2] in lc[2])
+            and (compiled[3] is None or compiled[3] == lc[0])
+        )
+
+    @staticmethod
+    def _app_candidates(index: dict[str, list[int]], compiled_patterns: list[tuple], app: str) -> list[int]:
+        """
+        Get indices of patterns whose app constraints accept an app name.
+
+        App names repeat across entries, so each distinct lowercased app is
+        checked against the full pattern list once and memoized in index.
+        Indices stay in pattern order so the first match wins as before.
+        """
+        candidates = index.get(app)
+        if candidates is None:
+            candidates = [
+                i for i, (compiled, *_) in enumerate(compiled_patterns)
+                if (compiled[0] is None or compiled[0] in app)
+                and (compiled[3] is None or compiled[3] == app)
+            ]
+            index[app] = candidates
+        return candidates
+
+    @staticmethod
+    def _title_url_match(compiled: tuple[Optional[str], ...], title: str, url: str) -> bool:
+        """Check the title and URL constraints of a compiled pattern."""
+        return (
+            (compiled[1] is None or compiled[1] in title)
+            and (compiled[2] is None or compiled[2] in url)
+        )
+
+    def _find_learned_match(self, lc: tuple[str, str, str]) -> Optional[dict]:
+        """Find a matching learned pattern for a lowercased (app, title, url) entry."""
+        app, title, url = lc
+        for i in self._app_candidates(self._learned_by_app, self._learned_patterns, app):
+            compiled, pattern = self._learned_patterns[i]
+            if self._title_url_match(compiled, title, url):
                 times_used = pattern.get("times_used", 0)
                 if times_used >= CONFIDENCE_THRESHOLD:
                     return {
@@ -149,37 +357,32 @@ class TaskMapper:
                     }
         return None
 
-    def _find_config_match(self, entry: dict) -> Optional[dict]:
-        """Find a matching pattern from config."""
-        for client in self.config.get("clients", []):
-            client_name = client.get("name", "Unknown")
-            for pattern in client.get("patterns", []):
-                if self._pattern_matches(pattern, entry):
-                    task_key = pattern.get("default_task", "")
-                    task_name = ""
-
-                    # Find task name
-                    for task in client.get("tasks", []):
-                        if task.get("key") == task_key:
-                            task_name = task.get("name", "")
-                            break
-
-                    return {
-                        "task_key": task_key,
-                        "task_name": task_name,
-                        "client": client_name,
-                        "confidence": "high",
-                        "source": "config",
-                    }
+    def _find_config_match(self, lc: tuple[str, str, str]) -> Optional[dict]:
+        """Find a matching pattern from config for a lowercased (app, title, url) entry."""
+        app, title, url = lc
+        for i in self._app_candidates(self._config_by_app, self._config_patterns, app):
+            compiled, pattern, client = self._config_patterns[i]
+            if self._title_url_match(compiled, title, url):
+                task_key = pattern.get("default_task", "")
+                client_name = client.get("name", "Unknown")
+                task_name = self._task_name_by_client_key.get((client_name, task_key), "")
+
+                return {
+                    "task_key": task_key,
+                    "task_name": task_name,
+                    "client": client_name,
+                    "confidence": "high",
+                    "source": "config",
+                }
         return None
 
-    def _find_category_match(self, entry: dict) -> Optional[dict]:
-        """Find a matching category (fallback)."""
-        app = entry.get("app", "")
+    def _find_category_match(self, lc: tuple[str, str, str]) -> Optional[dict]:
+        """Find a matching category (fallback) for a lowercased (app, title, url) entry."""
+        app = lc[0]
 
         for category, cat_config in self.config.get("categories", {}).items():
             for cat_app in cat_config.get("apps", []):
-                if cat_app.lower() in app.lower():
+                if cat_app.lower() in app:
                     return {
                         "task_key": cat_config.get("default_task"),
                         "task_name": "",
@@ -201,18 +404,23 @@ class TaskMapper:
             - confidence: 'high', 'low', or 'none'
             - source: 'learned', 'config', 'category', or 'none'
         """
+        self._maybe_reload()
+
+        # Lowercase the matchable fields once for all finders
+        lc = self._lowercase_entry(entry)
+
         # Priority 1: Learned patterns (user corrections)
-        match = self._find_learned_match(entry)
+        match = self._find_learned_match(lc)
         if match and match.get("task_key"):
             return match
 
         # Priority 2: Config patterns
-        match = self._find_config_match(entry)
+        match = self._find_config_match(lc)
         if match and match.get("task_key"):
             return match
 
         # Priority 3: Category fallback
-        match = self._find_category_match(entry)
+        match = self._find_category_match(lc)
         if match:
             return match
 
@@ -254,6 +462,8 @@ class TaskMapper:
 
         Creates or updates a learned pattern based on the entry.
         """
+        now_iso = datetime.now().isoformat()
+
         # Create pattern from entry
         pattern = {}
 
@@ -267,38 +477,35 @@ class TaskMapper:
 
         # Add title pattern if distinctive
         if title and len(title) > 3:
-            # Extract most distinctive part of title
-            words = title.split()
-            if words:
-                # Use first significant word
-                for word in words:
-                    if len(word) > 3 and word.lower() not in ["the", "and", "for"]:
-                        pattern["title_contains"] = word
-                        break
+            # Use first significant word, scanning lazily instead of splitting the whole title
+            for match in _WORD_RE.finditer(title):
+                word = match.group()
+                if len(word) > 3 and word.lower() not in _STOPWORDS:
+                    pattern["title_contains"] = word
+                    break
 
         # Add URL pattern if present
         if url:
             # Extract domain or path
-            from urllib.parse import urlparse
-
-            parsed = urlparse(url)
-            if parsed.netloc:
-                pattern["url_contains"] = parsed.netloc
+            netloc = _netloc_of(url)
+            if netloc:
+                pattern["url_contains"] = netloc
 
         if not pattern:
             logger.warning("Could not create pattern from entry")
             return
 
         # Check if pattern already exists
-        for existing in self.learned.get("patterns", []):
+        for index, existing in enumerate(self.learned.get("patterns", [])):
             if all(existing.get(k) == v for k, v in pattern.items() if k not in ["task_key", "task_name", "client", "times_used", "last_used"]):
                 # Update existing pattern
                 existing["task_key"] = task_key
                 existing["task_name"] = task_name
                 existing["client"] = client
                 existing["times_used"] = existing.get("times_used", 0) + 1
-                existing["last_used"] = datetime.now().isoformat()
-                self._save_learned_patterns()
+                existing["last_used"] = now_iso
+                self._compile_learned_patterns()
+                self._mark_dirty(index)
                 logger.info(f"Updated learned pattern: {pattern} -> {task_key}")
                 return
 
@@ -307,27 +514,29 @@ class TaskMapper:
         pattern["task_name"] = task_name
         pattern["client"] = client
         pattern["times_used"] = 1
-        pattern["date_added"] = datetime.now().isoformat()
-        pattern["last_used"] = datetime.now().isoformat()
+        pattern["date_added"] = now_iso
+        pattern["last_used"] = now_iso
 
         if "patterns" not in self.learned:
             self.learned["patterns"] = []
 
         self.learned["patterns"].append(pattern)
-        self._save_learned_patterns()
+        self._compile_learned_patterns()
+        self._mark_dirty(len(self.learned["patterns"]) - 1)
         logger.info(f"Added learned pattern: {pattern}")
 
     def increment_pattern_usage(self, entry: dict, task_key: str) -> None:
         """Increment usage count for a matched pattern (when user approves)."""
-        for pattern in self.learned.get("patterns", []):
-            if pattern.get("task_key") == task_key and self._pattern_matches(pattern, entry):
+        lc = self._lowercase_entry(entry)
+        for index, (compiled, pattern) in enumerate(self._learned_patterns):
+            if pattern.get("task_key") == task_key and self._pattern_matches(compiled, lc):
                 pattern["times_used"] = pattern.get("times_used", 0) + 1
                 pattern["last_used"] = datetime.now().isoformat()
-                self._save_learned_patterns()
+                self._mark_dirty(index)
                 return
 
-    def get_all_tasks(self) -> list[dict]:
-        """Get all configured tasks from all clients."""
+    def _cache_config_values(self) -> None:
+        """Precompute config-derived values served by the get_* accessors."""
         tasks = []
 
         # Add default task
@@ -349,24 +558,36 @@ class TaskMapper:
                     "client": client_name,
                 })
 
-        return tasks
-
-    def get_default_task(self) -> dict:
-        """Get the default task for unassigned time."""
-        default = self.config.get("default_task", {})
-        return {
+        self._all_tasks = tasks
+        self._default_task = {
             "key": default.get("key", "ADMIN-001"),
             "name": default.get("name", "Administrative / Unassigned"),
         }
+        self._rounding = self.config.get("rounding", "15min")
+        self._daily_target = self.config.get("daily_hours_target", 8.0)
+        self._min_duration = self.config.get("min_duration_minutes", 5)
+        self._tempo_config = self.config.get("tempo") or {}
+
+    def get_all_tasks(self) -> list[dict]:
+        """Get all configured tasks from all clients."""
+        return self._all_tasks
+
+    def get_default_task(self) -> dict:
+        """Get the default task for unassigned time."""
+        return self._default_task
 
     def get_rounding(self) -> str:
         """Get hour rounding setting."""
-        return self.config.get("rounding", "15min")
+        return self._rounding
 
     def get_daily_target(self) -> float:
         """Get daily hours target."""
-        return self.config.get("daily_hours_target", 8.0)
+        return self._daily_target
 
     def get_min_duration(self) -> int:
         """Get minimum block duration in minutes."""
-        return self.config.get("min_duration_minutes", 5)
+        return self._min_duration
+
+    def get_tempo_config(self) -> dict:
+        """Get the tempo section (api_url, api_token) of the config."""
+        return self._tempo_config
@@ -7,23 +7,109 @@ to generate human-readable summaries of work sessions.
 """
 
 import argparse
+import asyncio
+import functools
+import hashlib
 import json
 import logging
+import os
 import re
+import shutil
+import sqlite3
 import subprocess
 import sys
+import threading
+import urllib.error
+import urllib.request
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import llama_cpp
+    HAS_LLAMA_CPP = True
+except ImportError:
+    HAS_LLAMA_CPP = False
 
 # Default configuration
 DEFAULT_DATA_DIR = "data"
 DEFAULT_SUMMARY_DIR = "summaries"
 DEFAULT_MODEL = "llama3"
+BACKENDS = ("ollama", "llama-cpp")  # llama-cpp runs a local .gguf model in-process
+LLAMA_CPP_CONTEXT = 4096  # Context window for llama-cpp models
 DEFAULT_GAP_MINUTES = 15  # Minutes of gap to consider as new block
+READ_ALL_MAX_BYTES = 100 * 1024 * 1024  # Larger logs are streamed instead of read whole
+READ_CHUNK_BYTES = 1024 * 1024  # os.read() size when streaming large logs
+MAX_BLOCK_DETAILS = 5  # Unique titles/URLs kept per block
+TIME_FORMAT = "%02d:%02d"  # HH:MM for prompts and cache keys, filled from (hour, minute)
+SUMMARY_BATCH_SIZE = 3  # Days per LLM request in summarize_batch (bounded by context size)
+
+# Constant instructions sent ahead of every activity log. Keeping them
+# identical across calls lets Ollama reuse the cached prefix.
+_SYSTEM_PROMPT = """You summarize computer activity logs into work sessions.
+
+Based on the activity log you are given, create a JSON array summarizing each work session. Each session should have:
+- "from": start time (HH:MM format)
+- "to": end time (HH:MM format)
+- "summary": a brief description of what the user was likely doing (1-2 sentences)
+
+Focus on identifying the actual work being done (coding, browsing, writing, etc.) rather than just listing applications.
+
+Respond ONLY with a valid JSON array, no additional text. Example format:
+[
+  {"from": "09:00", "to": "10:30", "summary": "Writing code in VS Code, working on authentication module"},
+  {"from": "10:30", "to": "11:00", "summary": "Researching API documentation in browser"}
+]"""
+
+# Instructions for summarize_batch, which asks for several days in one reply
+_BATCH_SYSTEM_PROMPT = """You summarize computer activity logs into work sessions.
+
+You are given activity logs for several days, each starting with a "=== DATE YYYY-MM-DD ===" line. Summarize each day separately, as a JSON array of that day's work sessions. Each session should have:
+- "from": start time (HH:MM format)
+- "to": end time (HH:MM format)
+- "summary": a brief description of what the user was likely doing (1-2 sentences)
+
+Focus on identifying the actual work being done (coding, browsing, writing, etc.) rather than just listing applications.
+
+Respond ONLY with a valid JSON object whose keys are the dates and whose values are the session arrays, no additional text. Example format:
+{
+  "2024-01-15": [
+    {"from": "09:00", "to": "10:30", "summary": "Writing code in VS Code, working on authentication module"}
+  ],
+  "2024-01-16": [
+    {"from": "10:30", "to": "11:00", "summary": "Researching API documentation in browser"}
+  ]
+}"""
+
+# Date arguments, checked before the calendar validation in fromisoformat
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Scans one JSON value out of a larger string (see decode_embedded_json)
+_JSON_DECODER = json.JSONDecoder()
+
+DEFAULT_OLLAMA_HOST = "http://localhost:11434"  # Overridden by OLLAMA_HOST
+OLLAMA_TIMEOUT = 120  # Seconds to wait for a generation
+DEFAULT_OLLAMA_PARALLEL = 4  # Concurrent requests, overridden by OLLAMA_NUM_PARALLEL
+
+# Generation options: bound output length and keep answers focused
+OLLAMA_OPTIONS = {"num_predict": 1024, "temperature": 0.2}
+LLM_CACHE_FILENAME = ".llm_cache.sqlite"  # Stored in the data directory
+LLM_CACHE_TABLE = "llm_cache"  # Keyed by model + prompt
+SIGNATURE_CACHE_TABLE = "signature_cache"  # Keyed by model + block sequence, any date
+BLOCK_STATE_DIRNAME = ".block_state"  # Per-date grouping state, in the data directory
+BLOCK_STATE_VERSION = 1
 
 # Work-related apps (case-insensitive matching)
-WORK_APPS = {
+# Lowercase; an app is work-related if its name equals or contains one of these
+WORK_APPS = frozenset({
     "citrix viewer", "microsoft outlook", "outlook", "microsoft teams", "msteams",
     "teams", "slack", "zoom", "google chrome", "chrome", "safari", "arc",
     "visual studio code", "code", "vs code", "xcode", "terminal", "iterm",
@@ -32,7 +118,7 @@ WORK_APPS = {
     "figma", "sketch", "postman", "docker", "github desktop", "sourcetree",
     "intellij", "pycharm", "webstorm", "datagrip", "sublime text", "atom",
     "1password", "bitwarden", "keynote", "pages", "numbers", "mail",
-}
+})
 
 # URL patterns to exclude (entertainment, social media, etc.)
 EXCLUDED_URL_PATTERNS = [
@@ -41,6 +127,11 @@ EXCLUDED_URL_PATTERNS = [
     "tiktok.com", "discord.com", "spotify.com", "music.apple.com",
 ]
 
+# Each list as one alternation, so a single C-level scan replaces the per-pattern loop.
+# WORK_APPS is sorted so the pattern does not change with set iteration order.
+_WORK_APP_RE = re.compile("|".join(map(re.escape, sorted(WORK_APPS))))
+_EXCLUDED_URL_RE = re.compile("|".join(map(re.escape, EXCLUDED_URL_PATTERNS)))
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
@@ -49,49 +140,435 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def get_ollama_host() -> str:
+    """Get the Ollama server base URL, honoring the OLLAMA_HOST env var."""
+    host = os.environ.get("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
+    if not host.startswith(("http://", "https://")):
+        host = "http://" + host
+    return host.rstrip("/")
+
+
+def loads_line(line: bytes):
+    """Decode one JSONL line, using orjson when installed."""
+    if HAS_ORJSON:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def iter_log_lines(fd: int) -> Iterator[bytes]:
+    """
+    Yield the lines of an open log file as bytes, without their newlines.
+
+    Files up to READ_ALL_MAX_BYTES are read in one call and split in C,
+    which is the fastest path for daily logs. Bigger files are streamed
+    so peak memory stays bounded.
+
+    Args:
+        fd: Descriptor of a file opened for reading (not closed here)
+    """
+    if os.fstat(fd).st_size > READ_ALL_MAX_BYTES:
+        yield from iter_chunked_lines(fd)
+        return
+    with open(fd, "rb", closefd=False) as f:
+        data = f.read()
+    yield from data.split(b"\n")
+
+
+def iter_chunked_lines(fd: int, chunk_size: int = READ_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Yield the lines of an open file as bytes, without their newlines.
+
+    The file is read in fixed-size chunks with os.read() and each chunk is
+    split in C; only the partial last line is carried into the next chunk.
+    There is no text decoding and no per-line readline() call, and unlike
+    mmap this also works on pipes and other non-regular files.
+
+    Args:
+        fd: Descriptor of a file opened for reading (not closed here)
+        chunk_size: Bytes requested per read
+    """
+    rest = b""
+    while chunk := os.read(fd, chunk_size):
+        lines = (rest + chunk).split(b"\n")
+        rest = lines.pop()
+        yield from lines
+    if rest:
+        yield rest
+
+
+def decode_embedded_json(text: str, opener: str):
+    """
+    Decode the first JSON array or object embedded in free text.
+
+    Each opener position is handed to the C JSON scanner, which consumes
+    exactly one value, so brackets inside strings and text after the value
+    are handled correctly. Openers that do not start valid JSON (such as a
+    bracketed aside before the answer) are skipped.
+
+    Args:
+        text: Text containing the value, e.g. an LLM response
+        opener: "[" for an array, "{" for an object
+
+    Returns:
+        The decoded value
+
+    Raises:
+        ValueError: If text contains no opener
+        json.JSONDecodeError: If no opener starts a valid value (the first error)
+    """
+    start = text.find(opener)
+    if start < 0:
+        raise ValueError(f"no {opener!r} in text")
+    first_error = None
+    while start >= 0:
+        try:
+            return _JSON_DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError as e:
+            first_error = first_error or e
+        start = text.find(opener, start + 1)
+    raise first_error
+
+
+def dumps_pretty(obj) -> bytes:
+    """Serialize an object as indented UTF-8 JSON, using orjson when installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_compact(obj) -> bytes:
+    """Serialize an object as single-line UTF-8 JSON, using orjson when installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def print_json(obj, pretty: bool = True) -> None:
+    """Write an object as JSON (indented unless pretty is False) straight to stdout's byte buffer."""
+    sys.stdout.flush()  # Log lines share stdout; keep them in order
+    sys.stdout.buffer.write((dumps_pretty(obj) if pretty else dumps_compact(obj)) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def get_ollama_parallel() -> int:
+    """Get how many requests to send Ollama at once, honoring OLLAMA_NUM_PARALLEL."""
+    try:
+        return max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", DEFAULT_OLLAMA_PARALLEL)))
+    except ValueError:
+        return DEFAULT_OLLAMA_PARALLEL
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_work_app(app: str) -> bool:
+    """Check an app name against WORK_APPS (memoized, each name is lowercased once)."""
+    app = app.lower()
+    # Most logged app names are exactly a WORK_APPS entry; scan substrings only on a miss
+    return app in WORK_APPS or _WORK_APP_RE.search(app) is not None
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_excluded_url(url: str) -> bool:
+    """Check a URL against EXCLUDED_URL_PATTERNS (memoized, each URL is lowercased once)."""
+    return _EXCLUDED_URL_RE.search(url.lower()) is not None
+
+
+def log_session(session: dict) -> None:
+    """Log one LLM session summary (an on_session callback for streamed output)."""
+    logger.info(f"Session {session.get('from', '?')}-{session.get('to', '?')}: {session.get('summary', '')}")
+
+
+def date_range(start_date: str, end_date: str) -> list[str]:
+    """List every YYYY-MM-DD date from start_date to end_date, inclusive."""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+
+
+def _format_hhmm(t: datetime) -> str:
+    """Format a time as HH:MM (several times faster than strftime)."""
+    return TIME_FORMAT % (t.hour, t.minute)
+
+
+def llm_cache_key(model: str, *texts: str) -> str:
+    """Build the cache key for a model and the prompt text(s) sent to it."""
+    return hashlib.sha256("\0".join((model, *texts)).encode("utf-8")).hexdigest()
+
+
+def block_signature_key(model: str, blocks: list["ActivityBlock"]) -> str:
+    """
+    Build a date-independent cache key for a sequence of activity blocks.
+
+    Covers everything the prompt shows about each block (times, duration,
+    app, titles, URLs) except the date, so days with an identical
+    timeline share a summary.
+    """
+    signature = repr(tuple(
+        (
+            _format_hhmm(b.start_time), _format_hhmm(b.end_time), round(b.duration_minutes()),
+            b.app, tuple(b.titles[:3]), tuple(b.urls[:3]),
+        )
+        for b in blocks
+    ))
+    text = "\0".join((model, _SYSTEM_PROMPT, signature))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=32).hexdigest()
+
+
+def _connect_cache(db_path: str) -> sqlite3.Connection:
+    """Open the LLM cache database, creating the tables if needed."""
+    conn = sqlite3.connect(db_path, timeout=10)
+    for table in (LLM_CACHE_TABLE, SIGNATURE_CACHE_TABLE):
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, parsed TEXT, created TEXT)"
+        )
+    return conn
+
+
+@functools.lru_cache(maxsize=128)
+def _read_llm_cache(db_path: str, table: str, key: str) -> tuple[str, str]:
+    """
+    Look up a cached LLM response.
+
+    Raises KeyError on a miss so that only hits are kept in the in-process cache.
+
+    Returns:
+        Tuple of (raw response, parsed summary as JSON text)
+    """
+    conn = _connect_cache(db_path)
+    try:
+        row = conn.execute(
+            f"SELECT response, parsed FROM {table} WHERE key = ?", (key,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise KeyError(key)
+    return row
+
+
+def _load_and_group(summarizer: "ActivitySummarizer", date: str) -> tuple[list["ActivityBlock"], int]:
+    """Load and group one date's entries (module-level so process pools can pickle it)."""
+    return summarizer.load_blocks(date)
+
+
+class JsonValueTracker:
+    """
+    Incrementally detects when the first top-level JSON array or object in a text stream closes.
+
+    A bracketed span that does not decode as JSON (prose such as "[as
+    requested]" before the answer) is skipped, and scanning resumes after
+    its opening bracket.
+    """
+
+    def __init__(self):
+        self.pos = 0  # Characters consumed so far
+        self._chunks: list[str] = []
+        # (start, end) offsets of objects closed directly inside a top-level array,
+        # not yet collected by the caller
+        self.elements: list[tuple[int, int]] = []
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget the value being tracked, keeping the text received so far."""
+        self.depth = 0
+        self.started = False
+        self.start = 0  # Offset of the value's opening bracket
+        self.in_string = False
+        self.escaped = False
+        self.is_array = False
+        self._element_start: Optional[int] = None
+        self.elements.clear()
+
+    def feed(self, text: str) -> bool:
+        """
+        Consume the next piece of text.
+
+        Args:
+            text: Next chunk of the streamed response
+
+        Returns:
+            True once the closing bracket of a value that decodes as JSON has been seen
+        """
+        self._chunks.append(text)
+        return self._scan(text, self.pos)
+
+    def _scan(self, text: str, offset: int) -> bool:
+        """Scan text that starts at the given offset of the stream."""
+        for i, char in enumerate(text, offset):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char in "[{":
+                if not self.started:
+                    self.started = True
+                    self.start = i
+                    self.is_array = char == "["
+                self.depth += 1
+                if self.depth == 2 and self.is_array and char == "{":
+                    self._element_start = i
+            elif not self.started:
+                continue  # Ignore any preamble before the value
+            elif char == '"':
+                self.in_string = True
+            elif char in "]}":
+                self.depth -= 1
+                if self.depth == 1 and self._element_start is not None:
+                    self.elements.append((self._element_start, i + 1))
+                    self._element_start = None
+                elif self.depth == 0:
+                    received = "".join(self._chunks)
+                    try:
+                        _JSON_DECODER.raw_decode(received[:i + 1], self.start)
+                    except json.JSONDecodeError:
+                        # Not the answer; look again from just after its opener
+                        restart = self.start + 1
+                        self._reset()
+                        return self._scan(received[restart:], restart)
+                    self.pos = i + 1
+                    return True
+        self.pos = offset + len(text)
+        return False
+
+
 class ActivityBlock:
     """Represents a continuous block of similar activity."""
 
+    __slots__ = (
+        "start_time", "end_time", "app", "_titles", "_urls", "entry_count", "_duration_sec",
+        "_start_iso", "_end_iso",
+    )
+
     def __init__(self, start_time: datetime, app: str, title: str, url: Optional[str] = None):
         self.start_time = start_time
         self.end_time = start_time
         self.app = app
-        self.titles: list[str] = [title] if title else []
-        self.urls: list[str] = [url] if url else []
+        # Dicts as insertion-ordered sets: O(1) dedup, first-seen order kept
+        self._titles: dict[str, None] = {title: None} if title else {}
+        self._urls: dict[str, None] = {url: None} if url else {}
         self.entry_count = 1
+        self._duration_sec: Optional[float] = 0.0  # None until recomputed
+        # ISO strings for serialization, formatted on first use (see iso_times)
+        self._start_iso: Optional[str] = None
+        self._end_iso: Optional[str] = None
 
     def extend(self, end_time: datetime, title: str, url: Optional[str] = None) -> None:
         """Extend this block with a new entry."""
         self.end_time = end_time
-        if title and title not in self.titles:
-            self.titles.append(title)
-        if url and url not in self.urls:
-            self.urls.append(url)
+        self._duration_sec = None
+        self._end_iso = None
+        # Only the first few unique values are reported, so stop collecting once full.
+        # Re-adding a known key leaves its position unchanged.
+        if title and len(self._titles) < MAX_BLOCK_DETAILS:
+            self._titles[title] = None
+        if url and len(self._urls) < MAX_BLOCK_DETAILS:
+            self._urls[url] = None
         self.entry_count += 1
 
+    def merge(self, other: "ActivityBlock") -> None:
+        """
+        Append a later block of the same activity to this one.
+
+        Gives the same result as extend()-ing this block with each of the
+        other block's entries, since only the first MAX_BLOCK_DETAILS unique
+        values are ever kept.
+        """
+        self.end_time = other.end_time
+        self._duration_sec = None
+        self._end_iso = other._end_iso
+        for title in other._titles:
+            if len(self._titles) >= MAX_BLOCK_DETAILS:
+                break
+            self._titles[title] = None
+        for url in other._urls:
+            if len(self._urls) >= MAX_BLOCK_DETAILS:
+                break
+            self._urls[url] = None
+        self.entry_count += other.entry_count
+
+    @property
+    def titles(self) -> list[str]:
+        """Unique window titles in first-seen order (at most MAX_BLOCK_DETAILS)."""
+        return list(self._titles)
+
+    @property
+    def urls(self) -> list[str]:
+        """Unique URLs in first-seen order (at most MAX_BLOCK_DETAILS)."""
+        return list(self._urls)
+
     def duration_minutes(self) -> float:
         """Get the duration of this block in minutes."""
-        delta = self.end_time - self.start_time
-        return delta.total_seconds() / 60
+        # Computed once per block state, not on every extend()
+        if self._duration_sec is None:
+            self._duration_sec = (self.end_time - self.start_time).total_seconds()
+        return self._duration_sec / 60
+
+    def iso_times(self) -> tuple[str, str]:
+        """
+        Get the start and end times as ISO strings.
+
+        Each is formatted once and reused by to_dict() and to_state() until
+        the end time changes; blocks restored from state keep the saved strings.
+        """
+        if self._start_iso is None:
+            self._start_iso = self.start_time.isoformat()
+        if self._end_iso is None:
+            self._end_iso = self.end_time.isoformat()
+        return self._start_iso, self._end_iso
 
     def to_dict(self) -> dict:
         """Convert block to dictionary for JSON serialization."""
+        start_iso, end_iso = self.iso_times()
         result = {
-            "from": self.start_time.isoformat(),
-            "to": self.end_time.isoformat(),
+            "from": start_iso,
+            "to": end_iso,
             "duration_minutes": round(self.duration_minutes(), 1),
             "app": self.app,
-            "titles": self.titles[:5],  # Limit to 5 unique titles
+            "titles": list(self._titles),  # Already capped at MAX_BLOCK_DETAILS
             "entry_count": self.entry_count,
         }
-        if self.urls:
-            result["urls"] = self.urls[:5]  # Limit to 5 unique URLs
+        if self._urls:
+            result["urls"] = list(self._urls)
         return result
 
+    def to_state(self) -> dict:
+        """Convert block to a dictionary that from_state() restores exactly."""
+        start_iso, end_iso = self.iso_times()
+        return {
+            "start": start_iso,
+            "end": end_iso,
+            "app": self.app,
+            "titles": list(self._titles),
+            "urls": list(self._urls),
+            "entry_count": self.entry_count,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "ActivityBlock":
+        """Restore a block saved with to_state()."""
+        block = cls.__new__(cls)
+        block._start_iso = state["start"]
+        block._end_iso = state["end"]
+        block.start_time = datetime.fromisoformat(block._start_iso)
+        block.end_time = datetime.fromisoformat(block._end_iso)
+        block.app = state["app"]
+        block._titles = dict.fromkeys(state["titles"])
+        block._urls = dict.fromkeys(state["urls"])
+        block.entry_count = state["entry_count"]
+        block._duration_sec = None
+        return block
+
 
 class ActivitySummarizer:
     """Groups and summarizes daily activity logs."""
 
+    # llama-cpp models by path, loaded once per process and shared by instances
+    _llama_models: dict = {}
+    _llama_lock = threading.Lock()
+
     def __init__(
         self,
         data_dir: str = DEFAULT_DATA_DIR,
@@ -99,75 +576,266 @@ class ActivitySummarizer:
         gap_minutes: int = DEFAULT_GAP_MINUTES,
         work_only: bool = False,
         summary_dir: str = DEFAULT_SUMMARY_DIR,
+        backend: str = "ollama",
+        use_cache: bool = True,
+        on_session: Optional[Callable[[dict], None]] = None,
     ):
         self.data_dir = Path(data_dir)
         self.summary_dir = Path(summary_dir)
         self.model = model
+        self.backend = backend
+        self.ollama_host = get_ollama_host()
+        # Resolved once; only needed when the HTTP server is unreachable
+        self._ollama_cli = shutil.which("ollama")
+        self._server_unreachable = False
         self.gap_threshold = timedelta(minutes=gap_minutes)
         self.work_only = work_only
+        self._cache_path = self.data_dir / LLM_CACHE_FILENAME
+        # When False, cached summaries are ignored but fresh ones are still stored
+        self.use_cache = use_cache
+        # Called with each session as soon as the model finishes it (HTTP API only)
+        self.on_session = on_session
 
     def _is_work_entry(self, entry: dict) -> bool:
         """Check if an entry is work-related."""
-        app = entry.get("app", "").lower()
-        url = entry.get("url", "").lower()
+        # Work entry = work app AND not excluded URL
+        url = entry.get("url")
+        if url and _is_excluded_url(url):
+            return False
 
-        # Check if app is in work apps list
-        app_is_work = any(work_app in app for work_app in WORK_APPS)
+        # Check if app contains any work app name
+        return _is_work_app(entry.get("app", ""))
 
-        # Check if URL contains excluded patterns
-        url_is_excluded = any(pattern in url for pattern in EXCLUDED_URL_PATTERNS)
+    def iter_entries(self, date: str) -> Iterator[dict]:
+        """
+        Stream log entries for a specific date.
 
-        # Work entry = work app AND not excluded URL
-        if url_is_excluded:
-            return False
+        Entries are parsed and, with work_only, filtered one line at a time,
+        so the whole day is never held in memory.
 
-        return app_is_work
+        Args:
+            date: Date string in YYYY-MM-DD format
 
-    def _filter_work_entries(self, entries: list[dict]) -> list[dict]:
-        """Filter entries to only include work-related activity."""
-        filtered = [e for e in entries if self._is_work_entry(e)]
-        logger.info(f"Filtered to {len(filtered)} work entries (from {len(entries)} total)")
-        return filtered
+        Yields:
+            Log entry dictionaries
+        """
+        log_path = self.data_dir / f"{date}.jsonl"
 
-    def load_entries(self, date: str) -> list[dict]:
+        try:
+            fd = os.open(log_path, os.O_RDONLY)
+        except FileNotFoundError:
+            logger.error(f"Log file not found: {log_path}")
+            return
+
+        try:
+            yield from self._parse_lines(iter_log_lines(fd), log_path)
+        finally:
+            os.close(fd)
+
+    def _parse_lines(self, lines: Iterable[bytes], log_path: Path) -> Iterator[dict]:
         """
-        Load log entries for a specific date.
+        Parse JSONL lines into entries, applying the work filter.
+
+        Args:
+            lines: Raw lines without their newlines
+            log_path: File the lines were read from (for log messages)
+
+        Yields:
+            Log entry dictionaries
+        """
+        loaded = 0
+        kept = 0
+        for line_num, line in enumerate(lines, 1):
+            if not line or line.isspace():
+                continue
+            try:
+                entry = loads_line(line)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError; json.loads
+            # raises UnicodeDecodeError for invalid UTF-8 instead
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                logger.warning(f"Invalid JSON on line {line_num}: {e}")
+                continue
+            loaded += 1
+            if self.work_only and not self._is_work_entry(entry):
+                continue
+            kept += 1
+            yield entry
+
+        logger.info(f"Loaded {loaded} entries from {log_path}")
+        if self.work_only:
+            logger.info(f"Filtered to {kept} work entries (from {loaded} total)")
+
+    def _read_new_entries(
+        self, date: str, offset: int, inode: Optional[int]
+    ) -> Optional[tuple[Iterator[dict], int, int]]:
+        """
+        Read the entries appended to a date's log since a byte offset.
+
+        The new bytes are read at once, but entries are parsed lazily, so
+        grouping consumes them in the same pass with no intermediate list.
 
         Args:
             date: Date string in YYYY-MM-DD format
+            offset: Byte offset where the unread lines start
+            inode: Inode the offset belongs to, or None when reading from the start
 
         Returns:
-            List of log entry dictionaries
+            Tuple of (entry iterator, offset after the last line, file inode), or None
+            if the log cannot be read this way: it is missing, was replaced or
+            truncated, is too big to read whole, or ends mid-line
         """
         log_path = self.data_dir / f"{date}.jsonl"
+        try:
+            fd = os.open(log_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            stat = os.fstat(fd)
+            if inode is not None and stat.st_ino != inode:
+                return None
+            if not 0 <= stat.st_size - offset <= READ_ALL_MAX_BYTES:
+                return None
+            os.lseek(fd, offset, os.SEEK_SET)
+            with open(fd, "rb", closefd=False) as f:
+                data = f.read()
+        finally:
+            os.close(fd)
+
+        # The logger writes whole lines, so an unterminated tail is still being written
+        if data and not data.endswith(b"\n"):
+            return None
+        entries = self._parse_lines(data.split(b"\n"), log_path)
+        return entries, offset + len(data), stat.st_ino
 
-        if not log_path.exists():
-            logger.error(f"Log file not found: {log_path}")
-            return []
+    def load_blocks(self, date: str) -> tuple[list[ActivityBlock], int]:
+        """
+        Load and group a date's entries, resuming from its saved block state.
 
-        entries = []
-        with open(log_path, "r", encoding="utf-8") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                    entries.append(entry)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Invalid JSON on line {line_num}: {e}")
+        Each run saves the blocks, entry count and byte offset reached in the
+        log. The next run for the same date (e.g. a cron job during the day)
+        only parses lines appended since then and stitches their blocks onto
+        the saved ones, which yields the same blocks as regrouping the whole
+        file. The state is ignored, but rewritten, when use_cache is False.
 
-        logger.info(f"Loaded {len(entries)} entries from {log_path}")
+        Args:
+            date: Date string in YYYY-MM-DD format
 
-        if self.work_only:
-            entries = self._filter_work_entries(entries)
+        Returns:
+            Tuple of (activity blocks, number of entries they were built from)
+        """
+        state = self._load_block_state(date) if self.use_cache else None
+        blocks, total, offset, inode = state or ([], 0, 0, None)
+        if state:
+            logger.info(f"Resuming {date} from byte {offset} ({len(blocks)} saved blocks)")
+
+        new = self._read_new_entries(date, offset, inode)
+        if new is None and state:
+            # Log replaced or truncated since the state was saved: start over
+            blocks, total, offset, inode = [], 0, 0, None
+            new = self._read_new_entries(date, 0, None)
+        if new is None:
+            return self._group_entries(self.iter_entries(date))
+
+        entries, new_offset, inode = new
+        new_blocks, count = self._group_entries(entries)
+        if blocks and new_blocks:
+            last, first = blocks[-1], new_blocks[0]
+            # Same boundary test as _group_entries, across the two runs
+            if first.app == last.app and first.start_time - last.end_time <= self.gap_threshold:
+                last.merge(first)
+                new_blocks = new_blocks[1:]
+        blocks.extend(new_blocks)
+        total += count
+
+        if state is None or new_offset != offset:
+            self._save_block_state(date, blocks, total, new_offset, inode)
+        return blocks, total
+
+    def _block_state_path(self, date: str) -> Path:
+        """Get the block state file for a date and the current work filter."""
+        suffix = ".work.json" if self.work_only else ".json"
+        return self.data_dir / BLOCK_STATE_DIRNAME / f"{date}{suffix}"
+
+    def _load_block_state(
+        self, date: str
+    ) -> Optional[tuple[list[ActivityBlock], int, int, int]]:
+        """
+        Load the saved block state for a date.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
+
+        Returns:
+            Tuple of (blocks, entry count, byte offset, log inode), or None if
+            there is no usable state for the current settings
+        """
+        try:
+            with open(self._block_state_path(date), "rb") as f:
+                state = loads_line(f.read())
+            if (
+                state["version"] != BLOCK_STATE_VERSION
+                or state["gap_seconds"] != self.gap_threshold.total_seconds()
+                or state["work_only"] != self.work_only
+            ):
+                return None
+            blocks = [ActivityBlock.from_state(block) for block in state["blocks"]]
+            return blocks, state["entries"], state["offset"], state["inode"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable block state for {date}: {e}")
+            return None
+
+    def _save_block_state(
+        self, date: str, blocks: list[ActivityBlock], total: int, offset: int, inode: int
+    ) -> None:
+        """
+        Save a date's block state for load_blocks() to resume from.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
+            blocks: Activity blocks built so far
+            total: Number of entries the blocks were built from
+            offset: Byte offset after the last line read
+            inode: Inode of the log file
+        """
+        state = {
+            "version": BLOCK_STATE_VERSION,
+            "gap_seconds": self.gap_threshold.total_seconds(),
+            "work_only": self.work_only,
+            "offset": offset,
+            "inode": inode,
+            "entries": total,
+            "blocks": [block.to_state() for block in blocks],
+        }
+        path = self._block_state_path(date)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(dumps_compact(state))
+            os.replace(tmp_path, path)  # Readers never see a partial file
+        except OSError as e:
+            logger.warning(f"Failed to save block state for {date}: {e}")
+
+    def load_entries(self, date: str) -> list[dict]:
+        """
+        Load log entries for a specific date.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
 
-        return entries
+        Returns:
+            List of log entry dictionaries
+        """
+        return list(self.iter_entries(date))
 
     def _should_merge(self, block: ActivityBlock, entry: dict, entry_time: datetime) -> bool:
         """
         Determine if an entry should be merged into an existing block.
 
+        Deprecated: grouping now inlines this check. Kept for external callers.
+
         Args:
             block: Current activity block
             entry: New log entry
@@ -176,62 +844,80 @@ class ActivitySummarizer:
         Returns:
             True if the entry should be merged into the block
         """
-        # Check time gap
-        time_gap = entry_time - block.end_time
-        if time_gap > self.gap_threshold:
-            return False
-
-        # Check if same app
-        if entry.get("app") != block.app:
-            return False
-
-        return True
-
-    def group_into_blocks(self, entries: list[dict]) -> list[ActivityBlock]:
+        warnings.warn(
+            "ActivitySummarizer._should_merge is deprecated; grouping inlines the check",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return entry_time - block.end_time <= self.gap_threshold and entry.get("app") == block.app
+
+    def group_into_blocks(self, entries: Iterable[dict]) -> list[ActivityBlock]:
         """
         Group log entries into continuous activity blocks.
 
         Args:
-            entries: List of log entry dictionaries
+            entries: Iterable of log entry dictionaries (may be a generator)
 
         Returns:
             List of ActivityBlock objects
         """
-        if not entries:
-            return []
+        return self._group_entries(entries)[0]
 
+    def _group_entries(self, entries: Iterable[dict]) -> tuple[list[ActivityBlock], int]:
+        """
+        Group entries into blocks in a single pass, counting them on the way.
+
+        Args:
+            entries: Iterable of log entry dictionaries
+
+        Returns:
+            Tuple of (activity blocks, number of entries consumed)
+        """
         blocks: list[ActivityBlock] = []
         current_block: Optional[ActivityBlock] = None
+        gap_threshold = self.gap_threshold
+        # Bound once: the loop body should only be C calls and two comparisons
+        parse_ts = datetime.fromisoformat
+        new_block = blocks.append
+        prev_ts: Optional[datetime] = None
+        prev_app: Optional[str] = None
+        count = 0
 
         for entry in entries:
+            count += 1
             try:
-                ts = datetime.fromisoformat(entry["ts"])
+                ts = parse_ts(entry["ts"])
             except (KeyError, ValueError) as e:
                 logger.warning(f"Invalid timestamp in entry: {e}")
                 continue
 
+            # dict.get is as fast as an itemgetter here (measured) and keeps the defaults
             app = entry.get("app", "Unknown")
             title = entry.get("title", "")
             url = entry.get("url")
 
-            if current_block is None:
+            # Block boundary: first entry, gap too long, or app changed.
+            # Subtracting datetimes is a C-level op; converting each to a POSIX
+            # number with timestamp() first is several times slower.
+            if prev_ts is None or ts - prev_ts > gap_threshold or app != prev_app:
                 current_block = ActivityBlock(ts, app, title, url)
-            elif self._should_merge(current_block, entry, ts):
-                current_block.extend(ts, title, url)
+                new_block(current_block)
             else:
-                blocks.append(current_block)
-                current_block = ActivityBlock(ts, app, title, url)
-
-        if current_block:
-            blocks.append(current_block)
+                current_block.extend(ts, title, url)
+            prev_ts = ts
+            prev_app = app
 
-        logger.info(f"Grouped into {len(blocks)} activity blocks")
-        return blocks
+        if count:
+            logger.info(f"Grouped into {len(blocks)} activity blocks")
+        return blocks, count
 
     def generate_prompt(self, blocks: list[ActivityBlock], date: str) -> str:
         """
         Generate a prompt for the LLM to summarize activity blocks.
 
+        The instructions are sent separately as _SYSTEM_PROMPT; this is the
+        per-day part of the conversation.
+
         Args:
             blocks: List of activity blocks
             date: Date string for context
@@ -239,66 +925,249 @@ class ActivitySummarizer:
         Returns:
             Prompt string for the LLM
         """
-        block_summaries = []
-        for i, block in enumerate(blocks, 1):
-            summary = f"Block {i}:\n"
-            summary += f"  Time: {block.start_time.strftime('%H:%M')} - {block.end_time.strftime('%H:%M')}\n"
-            summary += f"  Duration: {block.duration_minutes():.0f} minutes\n"
-            summary += f"  Application: {block.app}\n"
+        blocks_text = self.format_activity_log(blocks)
 
-            if block.titles:
-                titles_str = "; ".join(block.titles[:3])
-                summary += f"  Window titles: {titles_str}\n"
+        # Instructions live in _SYSTEM_PROMPT so this variable part comes last
+        prompt = f"""Analyze the following computer activity log from {date} and provide a structured summary.
 
-            if block.urls:
-                urls_str = "; ".join(block.urls[:3])
-                summary += f"  URLs visited: {urls_str}\n"
+Activity Log:
+{blocks_text}
 
-            block_summaries.append(summary)
+JSON response:"""
 
-        blocks_text = "\n".join(block_summaries)
+        return prompt
 
-        prompt = f"""Analyze the following computer activity log from {date} and provide a structured summary.
+    def format_activity_log(self, blocks: list[ActivityBlock]) -> str:
+        """
+        Format activity blocks as the numbered log used in prompts.
 
-Activity Log:
-{blocks_text}
+        Args:
+            blocks: List of activity blocks
 
-Based on this activity, create a JSON array summarizing each work session. Each session should have:
-- "from": start time (HH:MM format)
-- "to": end time (HH:MM format)
-- "summary": a brief description of what the user was likely doing (1-2 sentences)
+        Returns:
+            One "Block N" section per block
+        """
+        # One flat list of pieces for the whole day, joined once
+        parts = []
+        for i, block in enumerate(blocks, 1):
+            if i > 1:
+                parts.append("\n")
+            parts.append(
+                f"Block {i}:\n"
+                f"  Time: {_format_hhmm(block.start_time)} - {_format_hhmm(block.end_time)}\n"
+                f"  Duration: {block.duration_minutes():.0f} minutes\n"
+                f"  Application: {block.app}\n"
+            )
+            titles = block.titles
+            if titles:
+                parts.append(f"  Window titles: {'; '.join(titles[:3])}\n")
+            urls = block.urls
+            if urls:
+                parts.append(f"  URLs visited: {'; '.join(urls[:3])}\n")
 
-Focus on identifying the actual work being done (coding, browsing, writing, etc.) rather than just listing applications.
+        return "".join(parts)
 
-Respond ONLY with a valid JSON array, no additional text. Example format:
-[
-  {{"from": "09:00", "to": "10:30", "summary": "Writing code in VS Code, working on authentication module"}},
-  {{"from": "10:30", "to": "11:00", "summary": "Researching API documentation in browser"}}
-]
+    def call_llm(
+        self,
+        prompt: str,
+        num_predict: int = OLLAMA_OPTIONS["num_predict"],
+        system_prompt: str = _SYSTEM_PROMPT,
+    ) -> Optional[str]:
+        """
+        Send a prompt to the configured backend and get the response.
 
-JSON response:"""
+        Args:
+            prompt: The prompt to send
+            num_predict: Maximum tokens to generate
+            system_prompt: Instructions sent ahead of the prompt
 
-        return prompt
+        Returns:
+            Model response string or None if failed
+        """
+        if self.backend == "llama-cpp":
+            return self._generate_llama_cpp(prompt, num_predict, system_prompt)
+        return self.call_ollama(prompt, num_predict, system_prompt)
+
+    def _generate_llama_cpp(self, prompt: str, num_predict: int, system_prompt: str = _SYSTEM_PROMPT) -> Optional[str]:
+        """
+        Run a generation in-process with llama-cpp-python.
 
-    def call_ollama(self, prompt: str) -> Optional[str]:
+        The model at self.model (a .gguf path) is loaded on first use and kept
+        for the rest of the process, so range runs pay the load only once.
+        Calls are serialized because a Llama instance is not thread-safe.
+
+        Args:
+            prompt: The prompt to send
+            num_predict: Maximum tokens to generate
+            system_prompt: Instructions sent as the system message
+
+        Returns:
+            Model response string or None if failed
+        """
+        if not HAS_LLAMA_CPP:
+            logger.error("llama-cpp backend requires llama-cpp-python (pip install llama-cpp-python)")
+            return None
+
+        logger.info(f"Running llama-cpp with model: {self.model}")
+        try:
+            with self._llama_lock:
+                llm = self._llama_models.get(self.model)
+                if llm is None:
+                    llm = llama_cpp.Llama(
+                        model_path=self.model,
+                        n_ctx=LLAMA_CPP_CONTEXT,
+                        n_threads=os.cpu_count(),
+                        verbose=False,
+                    )
+                    self._llama_models[self.model] = llm
+                completion = llm.create_chat_completion(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                    max_tokens=num_predict,
+                    temperature=OLLAMA_OPTIONS["temperature"],
+                )
+            return completion["choices"][0]["message"]["content"].strip()
+        except Exception as e:
+            logger.error(f"Failed to run llama-cpp: {e}")
+            return None
+
+    def call_ollama(
+        self,
+        prompt: str,
+        num_predict: int = OLLAMA_OPTIONS["num_predict"],
+        system_prompt: str = _SYSTEM_PROMPT,
+    ) -> Optional[str]:
         """
         Send a prompt to Ollama and get the response.
 
+        Talks to the running Ollama server over its HTTP API, which keeps the
+        model loaded between calls. Falls back to the `ollama run` CLI if the
+        server cannot be reached. Once neither is available, later calls
+        return None immediately.
+
         Args:
             prompt: The prompt to send
+            num_predict: Maximum tokens to generate (HTTP API only)
+            system_prompt: Instructions sent ahead of the prompt
 
         Returns:
             Model response string or None if failed
         """
+        if self._server_unreachable and self._ollama_cli is None:
+            return None  # Already reported
+
         logger.info(f"Calling Ollama with model: {self.model}")
 
+        if not self._server_unreachable:
+            try:
+                return self._generate_http(prompt, num_predict, system_prompt)
+            except urllib.error.HTTPError as e:
+                logger.error(f"Ollama error: {e.code} {e.read().decode('utf-8', 'replace').strip()}")
+                return None
+            except TimeoutError:
+                logger.error("Ollama request timed out")
+                return None
+            except urllib.error.URLError as e:
+                logger.debug(f"Ollama server not reachable at {self.ollama_host} ({e.reason}), using CLI")
+                self._server_unreachable = True
+            except (json.JSONDecodeError, OSError) as e:
+                logger.error(f"Failed to call Ollama: {e}")
+                return None
+
+        return self._generate_cli(prompt, system_prompt)
+
+    def _generate_http(self, prompt: str, num_predict: int, system_prompt: str = _SYSTEM_PROMPT) -> Optional[str]:
+        """
+        Run a streaming generation against the Ollama HTTP API.
+
+        Uses the chat endpoint with a constant system message (normally
+        _SYSTEM_PROMPT), so the server can reuse its cached prefix. Chunks
+        are collected as they arrive, and with on_session set each session
+        object is decoded and passed on as soon as it closes. The request is
+        closed as soon as the JSON value the prompt asks for is complete,
+        which also stops generation on the server.
+
+        Args:
+            prompt: The prompt to send
+            num_predict: Maximum tokens to generate
+            system_prompt: Instructions sent as the system message
+
+        Returns:
+            Model response string or None if the server reported an error
+        """
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            "stream": True,
+            "options": {**OLLAMA_OPTIONS, "num_predict": num_predict, "num_keep": len(system_prompt) // 4},  # ~4 chars per token
+        }
+        request = urllib.request.Request(
+            f"{self.ollama_host}/api/chat",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        parts = []
+        tracker = JsonValueTracker()
+        with urllib.request.urlopen(request, timeout=OLLAMA_TIMEOUT) as response:
+            for line in response:
+                if line.isspace():
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    logger.error(f"Ollama error: {chunk['error']}")
+                    return None
+                text = chunk.get("message", {}).get("content", "")
+                parts.append(text)
+                closed = tracker.feed(text)
+                if tracker.elements and self.on_session is not None:
+                    self._emit_sessions("".join(parts), tracker.elements)
+                tracker.elements.clear()
+                if closed or chunk.get("done"):
+                    break
+        return "".join(parts).strip()
+
+    def _emit_sessions(self, received: str, spans: list[tuple[int, int]]) -> None:
+        """
+        Decode finished session objects from a partial response and pass them to on_session.
+
+        Args:
+            received: Response text received so far
+            spans: (start, end) offsets of the session objects that just closed
+        """
+        for start, end in spans:
+            try:
+                session = json.loads(received[start:end])
+            except json.JSONDecodeError:
+                continue  # The full response is still parsed (and reported) at the end
+            self.on_session(session)
+
+    def _generate_cli(self, prompt: str, system_prompt: str = _SYSTEM_PROMPT) -> Optional[str]:
+        """
+        Run a generation through the `ollama run` CLI.
+
+        Args:
+            prompt: The prompt to send
+            system_prompt: Instructions placed ahead of the prompt
+
+        Returns:
+            Model response string or None if failed
+        """
+        if self._ollama_cli is None:
+            logger.error("Ollama not found. Please install Ollama first.")
+            return None
+
         try:
             result = subprocess.run(
-                ["ollama", "run", self.model],
-                input=prompt,
+                [self._ollama_cli, "run", self.model],
+                input=f"{system_prompt}\n\n{prompt}",
                 capture_output=True,
                 text=True,
-                timeout=120  # 2 minute timeout
+                timeout=OLLAMA_TIMEOUT
             )
 
             if result.returncode != 0:
@@ -317,6 +1186,57 @@ JSON response:"""
             logger.error(f"Failed to call Ollama: {e}")
             return None
 
+    def _cache_get(
+        self, key: str, table: str = LLM_CACHE_TABLE
+    ) -> Optional[tuple[str, list[dict]]]:
+        """
+        Get a cached LLM response and its parsed summary.
+
+        Args:
+            key: Cache key from llm_cache_key() or block_signature_key()
+            table: LLM_CACHE_TABLE or SIGNATURE_CACHE_TABLE
+
+        Returns:
+            Tuple of (raw response, parsed summary) or None on a miss
+        """
+        if not self.use_cache or not self._cache_path.exists():
+            return None
+        try:
+            response, parsed = _read_llm_cache(str(self._cache_path), table, key)
+        except KeyError:
+            return None
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read LLM cache: {e}")
+            return None
+        return response, json.loads(parsed)
+
+    def _cache_put(
+        self, key: str, response: str, parsed: list[dict], table: str = LLM_CACHE_TABLE
+    ) -> None:
+        """
+        Store an LLM response and its parsed summary in the on-disk cache.
+
+        Args:
+            key: Cache key from llm_cache_key() or block_signature_key()
+            response: Raw LLM response
+            parsed: Summary parsed from the response
+            table: LLM_CACHE_TABLE or SIGNATURE_CACHE_TABLE
+        """
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = _connect_cache(str(self._cache_path))
+            try:
+                with conn:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?, ?)",
+                        (key, self.model, response, json.dumps(parsed, ensure_ascii=False),
+                         datetime.now().isoformat()),
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to write LLM cache: {e}")
+
     def parse_llm_response(self, response: str) -> Optional[list[dict]]:
         """
         Parse the LLM response to extract JSON.
@@ -327,22 +1247,15 @@ JSON response:"""
         Returns:
             Parsed JSON list or None if parsing failed
         """
-        # Try to find JSON array in response
-        json_match = re.search(r'\[[\s\S]*\]', response)
-        if not json_match:
-            logger.error("No JSON array found in LLM response")
-            return None
-
+        # Decode the first JSON array in the response, ignoring surrounding text
         try:
-            result = json.loads(json_match.group())
-            if isinstance(result, list):
-                return result
-            else:
-                logger.error("LLM response is not a JSON array")
-                return None
+            return decode_embedded_json(response, "[")
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response as JSON: {e}")
             return None
+        except ValueError:
+            logger.error("No JSON array found in LLM response")
+            return None
 
     def summarize(self, date: str, use_llm: bool = True) -> dict:
         """
@@ -355,37 +1268,285 @@ JSON response:"""
         Returns:
             Summary dictionary with blocks and optional LLM summary
         """
-        entries = self.load_entries(date)
-        if not entries:
+        blocks, total_entries = self.load_blocks(date)
+        return self._summarize_grouped(date, blocks, total_entries, use_llm)
+
+    def _summarize_grouped(
+        self, date: str, blocks: list[ActivityBlock], total_entries: int, use_llm: bool
+    ) -> dict:
+        """
+        Build the summary for a date whose entries are already grouped.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
+            blocks: Activity blocks for the date
+            total_entries: Number of entries the blocks were built from
+            use_llm: Whether to use LLM for summary generation
+
+        Returns:
+            Summary dictionary with blocks and optional LLM summary
+        """
+        if not total_entries:
             return {"date": date, "error": "No entries found", "blocks": []}
 
-        blocks = self.group_into_blocks(entries)
         blocks_data = [block.to_dict() for block in blocks]
 
         result = {
             "date": date,
-            "total_entries": len(entries),
+            "total_entries": total_entries,
             "blocks": blocks_data,
         }
 
         if use_llm and blocks:
-            prompt = self.generate_prompt(blocks, date)
-            logger.debug(f"Generated prompt:\n{prompt}")
-
-            response = self.call_ollama(prompt)
-            if response:
-                logger.debug(f"LLM response:\n{response}")
-                llm_summary = self.parse_llm_response(response)
-                if llm_summary:
-                    result["summary"] = llm_summary
-                else:
-                    result["llm_raw"] = response
-                    result["summary_error"] = "Failed to parse LLM response"
+            cached, job = self._lookup_llm_cache(date, blocks)
+            if cached:
+                response, llm_summary = cached
+            else:
+                response = self.call_llm(job["prompt"])
+                llm_summary = None
+            self._apply_llm_response(result, job, response, llm_summary)
+
+        return result
+
+    def _lookup_llm_cache(
+        self, date: str, blocks: list[ActivityBlock]
+    ) -> tuple[Optional[tuple[str, list[dict]]], dict]:
+        """
+        Check the summary caches for a date, building its prompt on a miss.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
+            blocks: Activity blocks for the date
+
+        Returns:
+            Tuple of (cached response and summary or None, job dict with the
+            date, prompt and cache keys needed to call the LLM and store the result)
+        """
+        # A day with the same block sequence as an earlier one reuses its summary
+        job = {
+            "date": date,
+            "activity_log": None,
+            "prompt": None,
+            "cache_key": None,
+            "signature_key": block_signature_key(self.model, blocks),
+        }
+        cached = self._cache_get(job["signature_key"], SIGNATURE_CACHE_TABLE)
+        if cached:
+            logger.info(f"Using cached LLM summary for {date} (identical activity)")
+            return cached, job
+
+        job["activity_log"] = self.format_activity_log(blocks)
+        job["prompt"] = self.generate_prompt(blocks, date)
+        logger.debug(f"Generated prompt:\n{job['prompt']}")
+
+        # Identical prompts (same model, unchanged logs) reuse the stored summary
+        job["cache_key"] = llm_cache_key(self.model, _SYSTEM_PROMPT, job["prompt"])
+        cached = self._cache_get(job["cache_key"])
+        if cached:
+            logger.info(f"Using cached LLM summary for {date}")
+        return cached, job
+
+    def _apply_llm_response(
+        self, result: dict, job: dict, response: Optional[str], llm_summary: Optional[list[dict]]
+    ) -> None:
+        """
+        Parse and cache an LLM response, then record it in a date's result.
+
+        Args:
+            result: Summary dictionary to update
+            job: Job dict from _lookup_llm_cache()
+            response: Raw LLM response, or None if the call failed
+            llm_summary: Already-parsed summary (cache hit), or None to parse response
+        """
+        if not response:
+            result["summary_error"] = "Failed to get LLM response"
+            return
+
+        logger.debug(f"LLM response:\n{response}")
+        if llm_summary is None:
+            llm_summary = self.parse_llm_response(response)
+            if llm_summary:
+                self._cache_put(job["cache_key"], response, llm_summary)
+                self._cache_put(job["signature_key"], response, llm_summary, SIGNATURE_CACHE_TABLE)
+        if llm_summary:
+            result["summary"] = llm_summary
+        else:
+            result["llm_raw"] = response
+            result["summary_error"] = "Failed to parse LLM response"
+
+    def summarize_batch(self, dates: list[str], use_llm: bool = True) -> list[dict]:
+        """
+        Summarize several dates with one LLM request per SUMMARY_BATCH_SIZE days.
+
+        Cached days are skipped. The remaining days' prompts are sent together
+        and the model answers with a JSON object keyed by date. Any batch whose
+        answer does not cover every date is retried one day at a time.
+
+        Args:
+            dates: Date strings in YYYY-MM-DD format
+            use_llm: Whether to use LLM for summary generation
+
+        Returns:
+            Summary dictionaries, in the same order as dates
+        """
+        results = []
+        pending = []
+        for date in dates:
+            blocks, total_entries = self.load_blocks(date)
+            result = self._summarize_grouped(date, blocks, total_entries, use_llm=False)
+            results.append(result)
+            if not (use_llm and blocks):
+                continue
+            cached, job = self._lookup_llm_cache(date, blocks)
+            if cached:
+                self._apply_llm_response(result, job, *cached)
             else:
-                result["summary_error"] = "Failed to get LLM response"
+                pending.append((result, job))
+
+        for i in range(0, len(pending), SUMMARY_BATCH_SIZE):
+            batch = pending[i:i + SUMMARY_BATCH_SIZE]
+            by_date = None
+            if len(batch) > 1:
+                jobs = [job for _, job in batch]
+                response = self.call_llm(
+                    self.generate_batch_prompt(jobs),
+                    num_predict=OLLAMA_OPTIONS["num_predict"] * len(batch),
+                    system_prompt=_BATCH_SYSTEM_PROMPT,
+                )
+                if response:
+                    by_date = self.parse_batch_response(response, [job["date"] for job in jobs])
+                if by_date is None:
+                    logger.warning("Batched LLM response unusable, summarizing dates one at a time")
+
+            for result, job in batch:
+                if by_date is not None:
+                    day_response = json.dumps(by_date[job["date"]], ensure_ascii=False)
+                else:
+                    day_response = self.call_llm(job["prompt"])
+                self._apply_llm_response(result, job, day_response, None)
+
+        return results
+
+    def generate_batch_prompt(self, jobs: list[dict]) -> str:
+        """
+        Combine several days' activity logs into one request.
+
+        The instructions are sent separately as _BATCH_SYSTEM_PROMPT, so each
+        day contributes only its log, not the single-day prompt around it.
 
+        Args:
+            jobs: Job dicts from _lookup_llm_cache(), each with an activity log
+
+        Returns:
+            Prompt asking for a JSON object keyed by date
+        """
+        sections = "".join(f"=== DATE {job['date']} ===\n{job['activity_log']}\n" for job in jobs)
+        return f"""Analyze the following computer activity logs and provide a structured summary of each day.
+
+{sections}
+JSON object response:"""
+
+    def parse_batch_response(self, response: str, dates: list[str]) -> Optional[dict[str, list[dict]]]:
+        """
+        Parse a batched LLM response keyed by date.
+
+        Args:
+            response: Raw LLM response string
+            dates: Dates the response must cover
+
+        Returns:
+            Mapping of date to session list, or None if any date is missing or malformed
+        """
+        try:
+            result = decode_embedded_json(response, "{")
+        except ValueError:  # Includes json.JSONDecodeError
+            return None
+        if not all(isinstance(result.get(date), list) for date in dates):
+            return None
         return result
 
+    async def summarize_many(self, dates: list[str], use_llm: bool = True) -> list[dict]:
+        """
+        Summarize several dates concurrently.
+
+        Each date runs in a worker thread so the Ollama requests overlap. At
+        most OLLAMA_NUM_PARALLEL dates are in flight, matching how many
+        requests the server processes at the same time.
+
+        Args:
+            dates: Date strings in YYYY-MM-DD format
+            use_llm: Whether to use LLM for summary generation
+
+        Returns:
+            Summary dictionaries, in the same order as dates
+        """
+        return await self._gather_limited(self.summarize, [(date, use_llm) for date in dates])
+
+    async def summarize_dates(self, dates: list[str], use_llm: bool = True) -> list[dict]:
+        """
+        Summarize many dates, parsing logs in parallel processes.
+
+        Loading and grouping is CPU-bound and independent per date, so it
+        runs in a process pool. The LLM step then runs as one concurrent
+        batch, like summarize_many.
+
+        Args:
+            dates: Date strings in YYYY-MM-DD format
+            use_llm: Whether to use LLM for summary generation
+
+        Returns:
+            Summary dictionaries, in the same order as dates
+        """
+        if not dates:
+            return []
+
+        workers = min(len(dates), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            grouped = list(pool.map(_load_and_group, [self] * len(dates), dates))
+
+        return await self._gather_limited(
+            self._summarize_grouped,
+            [(date, blocks, total, use_llm) for date, (blocks, total) in zip(dates, grouped)],
+        )
+
+    async def _gather_limited(self, func, calls: list[tuple]) -> list:
+        """
+        Run func over each argument tuple in worker threads.
+
+        At most OLLAMA_NUM_PARALLEL calls are in flight at once.
+
+        Args:
+            func: Blocking callable to run
+            calls: Argument tuples, one per call
+
+        Returns:
+            Results in the same order as calls
+        """
+        semaphore = asyncio.Semaphore(get_ollama_parallel())
+
+        async def run(args: tuple):
+            async with semaphore:
+                return await asyncio.to_thread(func, *args)
+
+        return await asyncio.gather(*(run(args) for args in calls))
+
+    async def summarize_range(self, start_date: str, end_date: str, use_llm: bool = True) -> list[dict]:
+        """
+        Summarize every date from start_date to end_date, inclusive.
+
+        Log parsing for the range runs in parallel processes (see
+        summarize_dates).
+
+        Args:
+            start_date: First date in YYYY-MM-DD format
+            end_date: Last date in YYYY-MM-DD format
+            use_llm: Whether to use LLM for summary generation
+
+        Returns:
+            Summary dictionaries, one per date in order
+        """
+        return await self.summarize_dates(date_range(start_date, end_date), use_llm)
+
     def summarize_blocks_only(self, date: str) -> list[dict]:
         """
         Generate block summaries without LLM.
@@ -396,8 +1557,7 @@ JSON response:"""
         Returns:
             List of block dictionaries
         """
-        entries = self.load_entries(date)
-        blocks = self.group_into_blocks(entries)
+        blocks, _ = self.load_blocks(date)
         return [block.to_dict() for block in blocks]
 
     def save_summary(self, result: dict, date: str) -> Path:
@@ -413,8 +1573,8 @@ JSON response:"""
         """
         self.summary_dir.mkdir(parents=True, exist_ok=True)
         output_path = self.summary_dir / f"{date}-summary.json"
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        with open(output_path, "wb") as f:
+            f.write(dumps_pretty(result))
         logger.info(f"Summary saved to {output_path}")
         return output_path
 
@@ -422,13 +1582,27 @@ JSON response:"""
 def main():
     """Main entry point for the summarizer."""
     parser = argparse.ArgumentParser(
-        description="Summarize daily activity logs using local LLM"
+        description="Summarize daily activity logs using local LLM",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "environment:\n"
+            f"  OLLAMA_HOST          Ollama server address (default: {DEFAULT_OLLAMA_HOST})\n"
+            "  OLLAMA_NUM_PARALLEL  Dates sent to Ollama at once when summarizing several\n"
+            f"                       (default: {DEFAULT_OLLAMA_PARALLEL}); start `ollama serve` with the same value"
+        ),
     )
     parser.add_argument(
-        "date",
-        nargs="?",
-        default=datetime.now().strftime("%Y-%m-%d"),
-        help="Date to summarize (YYYY-MM-DD format, default: today)"
+        "dates",
+        nargs="*",
+        metavar="date",
+        help="Date(s) to summarize (YYYY-MM-DD format, default: today). "
+             "Several dates are summarized concurrently"
+    )
+    parser.add_argument(
+        "--range",
+        nargs=2,
+        metavar=("START", "END"),
+        help="Summarize every date from START to END inclusive, parsing logs in parallel processes"
     )
     parser.add_argument(
         "-d", "--data-dir",
@@ -440,7 +1614,13 @@ def main():
         "-m", "--model",
         type=str,
         default=DEFAULT_MODEL,
-        help=f"Ollama model to use (default: {DEFAULT_MODEL})"
+        help=f"Ollama model to use, or a .gguf path with --backend llama-cpp (default: {DEFAULT_MODEL})"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="ollama",
+        help="LLM backend: Ollama server/CLI, or llama-cpp-python in-process (default: ollama)"
     )
     parser.add_argument(
         "-g", "--gap",
@@ -456,7 +1636,22 @@ def main():
     parser.add_argument(
         "--blocks-only",
         action="store_true",
-        help="Output only the activity blocks as JSON"
+        help="Output only the activity blocks as compact JSON"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help=f"Send up to {SUMMARY_BATCH_SIZE} dates per LLM request instead of one request per date"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached LLM summaries and saved block state, and rebuild both"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Log each session as soon as the model has written it, before the full summary is ready"
     )
     parser.add_argument(
         "--work-only",
@@ -486,18 +1681,33 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if args.range and (args.dates or args.yesterday):
+        parser.error("--range cannot be combined with dates or --yesterday")
+
     # Handle yesterday flag
-    if args.yesterday:
-        target_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    if args.range:
+        target_dates = args.range
+    elif args.yesterday:
+        target_dates = [(datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")]
     else:
-        target_date = args.date
+        target_dates = args.dates or [datetime.now().strftime("%Y-%m-%d")]
 
     # Validate date format
-    try:
-        datetime.strptime(target_date, "%Y-%m-%d")
-    except ValueError:
-        logger.error(f"Invalid date format: {target_date}. Use YYYY-MM-DD.")
-        sys.exit(1)
+    for target_date in target_dates:
+        try:
+            # fromisoformat alone also accepts forms like 20241201
+            if not _DATE_RE.fullmatch(target_date):
+                raise ValueError(target_date)
+            datetime.fromisoformat(target_date)
+        except ValueError:
+            logger.error(f"Invalid date format: {target_date}. Use YYYY-MM-DD.")
+            sys.exit(1)
+
+    if args.range:
+        target_dates = date_range(*args.range)
+        if not target_dates:
+            logger.error(f"Invalid range: {args.range[0]} is after {args.range[1]}")
+            sys.exit(1)
 
     summarizer = ActivitySummarizer(
         data_dir=args.data_dir,
@@ -505,18 +1715,35 @@ def main():
         gap_minutes=args.gap,
         work_only=args.work_only,
         summary_dir=args.output or DEFAULT_SUMMARY_DIR,
+        backend=args.backend,
+        use_cache=not args.no_cache,
+        on_session=log_session if args.stream else None,
     )
 
     if args.blocks_only:
-        blocks = summarizer.summarize_blocks_only(target_date)
-        print(json.dumps(blocks, indent=2))
+        if len(target_dates) == 1:
+            blocks = summarizer.summarize_blocks_only(target_dates[0])
+        else:
+            blocks = {d: summarizer.summarize_blocks_only(d) for d in target_dates}
+        # Machine-oriented output: compact, pipe through jq to read it
+        print_json(blocks, pretty=False)
     else:
-        result = summarizer.summarize(target_date, use_llm=not args.no_llm)
+        if len(target_dates) == 1:
+            results = [summarizer.summarize(target_dates[0], use_llm=not args.no_llm)]
+        elif args.batch:
+            results = summarizer.summarize_batch(target_dates, use_llm=not args.no_llm)
+        elif args.range:
+            results = asyncio.run(summarizer.summarize_dates(target_dates, use_llm=not args.no_llm))
+        else:
+            results = asyncio.run(summarizer.summarize_many(target_dates, use_llm=not args.no_llm))
 
         if args.output:
-            summarizer.save_summary(result, target_date)
+            for result in results:
+                summarizer.save_summary(result, result["date"])
+        elif len(results) == 1:
+            print_json(results[0])
         else:
-            print(json.dumps(result, indent=2))
+            print_json(results)
 
 
 if __name__ == "__main__":
@@ -2,32 +2,274 @@
 AppleScript wrappers and utility functions for macOS activity tracking.
 """
 
-import subprocess
+import hashlib
+import json
 import logging
+import os
+import re
+import select
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Field separator for get_active_context (ASCII unit separator)
+CONTEXT_SEPARATOR = "\x1f"
+
+# Callers within this many seconds share one get_active_context result
+CONTEXT_TTL = 0.2
+
+# Per-browser URL lookups run from the fused context script. They are kept as
+# strings and compiled with `run script` only when that browser is frontmost,
+# so a missing browser never breaks compilation of the whole script.
+_CHROME_URL_SCRIPT = 'tell application "Google Chrome" to return URL of active tab of front window'
+CONTEXT_URL_SCRIPTS = {
+    "Google Chrome": _CHROME_URL_SCRIPT,
+    "Chrome": _CHROME_URL_SCRIPT,
+    "Safari": 'tell application "Safari" to return URL of current tab of front window',
+    "Arc": 'tell application "Arc" to return URL of active tab of front window',
+}
+
+# Numbered record header in `lsappinfo list` output, e.g. ` 12) "Finder" ASN:...`
+_LSAPPINFO_HEADER_RE = re.compile(r"^\s*\d+\)")
+
+# Compiled .scpt files used when scripts run as separate osascript processes
+SCRIPT_CACHE_DIR = Path.home() / ".cache" / "activitygoblin"
+
+# Seconds to wait for the osascript worker before killing it
+OSA_WORKER_TIMEOUT = 5
+
+# JXA program run by the persistent worker. Each stdin line is a JSON-encoded
+# AppleScript source; each stdout line is {"ok": bool, "out": str}. Sources are
+# compiled once through NSAppleScript and reused on later calls.
+_OSA_WORKER_SCRIPT = r"""
+ObjC.import('Foundation');
+function run() {
+    const stdin = $.NSFileHandle.fileHandleWithStandardInput;
+    const stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+    const compiled = {};
+    let buffer = '';
+    for (;;) {
+        const data = stdin.availableData;
+        if (data.length === 0) return '';
+        buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const source = JSON.parse(buffer.slice(0, newline));
+            buffer = buffer.slice(newline + 1);
+            if (!(source in compiled)) {
+                compiled[source] = $.NSAppleScript.alloc.initWithSource(source);
+            }
+            const error = Ref();
+            const result = compiled[source].executeAndReturnError(error);
+            let reply;
+            if (result.isNil()) {
+                const info = ObjC.deepUnwrap(error[0]) || {};
+                reply = {ok: false, out: String(info.NSAppleScriptErrorMessage || 'unknown error')};
+            } else {
+                reply = {ok: true, out: ObjC.unwrap(result.stringValue) || ''};
+            }
+            stdout.writeData($(JSON.stringify(reply) + '\n').dataUsingEncoding($.NSUTF8StringEncoding));
+        }
+    }
+}
+"""
+
+_last_context: Optional[dict] = None
+_last_context_at = 0.0
+
+# Compiled .scpt paths by script source; failures are not stored so they are retried
+_compiled_scripts: dict[str, Path] = {}
+
+
+class _OSAWorker:
+    """
+    Long-running osascript process that executes AppleScript sent over stdin.
+
+    Saves the process launch and OSA runtime start-up that every
+    `osascript -e` call pays. The process is started on first use and
+    restarted after it dies or stops answering.
+    """
+
+    _instance: Optional["_OSAWorker"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._buffer = b""
+        self.available = True
+
+    @classmethod
+    def instance(cls) -> "_OSAWorker":
+        """Return the shared worker, creating it on first use."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _spawn(self) -> subprocess.Popen:
+        """Start the osascript process, disabling the worker if that fails."""
+        try:
+            self._proc = subprocess.Popen(
+                ["osascript", "-l", "JavaScript", "-e", _OSA_WORKER_SCRIPT],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
+            )
+        except OSError:
+            self.available = False
+            raise
+        self._buffer = b""
+        return self._proc
+
+    def _kill(self) -> None:
+        """Terminate the osascript process so the next call starts a fresh one."""
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+
+    def _read_line(self, proc: subprocess.Popen) -> bytes:
+        """
+        Read one reply line from the worker.
+
+        Raises:
+            TimeoutError: No reply within OSA_WORKER_TIMEOUT seconds
+            EOFError: The worker exited
+        """
+        deadline = time.monotonic() + OSA_WORKER_TIMEOUT
+        fd = proc.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError("osascript worker did not answer")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError("osascript worker exited")
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line
+
+    def send(self, script: str) -> Optional[str]:
+        """
+        Run an AppleScript in the worker process.
+
+        Args:
+            script: AppleScript code to execute
+
+        Returns:
+            Script output as string, or None if the script failed
+
+        Raises:
+            TimeoutError: The worker hung and was killed
+            OSError, EOFError, ValueError: The worker could not be used
+        """
+        with self._lock:
+            proc = self._proc
+            if proc is None or proc.poll() is not None:
+                proc = self._spawn()
+            try:
+                proc.stdin.write(json.dumps(script).encode("ascii") + b"\n")
+                reply = json.loads(self._read_line(proc))
+            except BaseException:
+                self._kill()
+                raise
+
+        if reply["ok"]:
+            return reply["out"].rstrip("\n")
+        logger.debug(f"AppleScript error: {reply['out']}")
+        return None
+
+
+def _compiled_script(script: str) -> Optional[Path]:
+    """
+    Compile an AppleScript to a cached .scpt file with osacompile.
+
+    Files are named by a hash of the source, so each distinct script is
+    compiled once per machine and reused across runs.
+
+    Args:
+        script: AppleScript source
+
+    Returns:
+        Path to the compiled script, or None if it could not be compiled
+    """
+    cached = _compiled_scripts.get(script)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha1(script.encode("utf-8")).hexdigest()[:16]
+    path = SCRIPT_CACHE_DIR / f"{digest}.scpt"
+    if path.exists():
+        _compiled_scripts[script] = path
+        return path
+
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        SCRIPT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        result = subprocess.run(
+            ["osacompile", "-o", str(tmp_path), "-e", script],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        if result.returncode != 0:
+            logger.debug(f"osacompile error: {result.stderr.strip()}")
+            return None
+        os.replace(tmp_path, path)
+        _compiled_scripts[script] = path
+        return path
+    except Exception as e:
+        logger.debug(f"Could not compile AppleScript: {e}")
+        return None
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
 
 def run_applescript(script: str) -> Optional[str]:
     """
     Execute an AppleScript and return the result.
 
+    Scripts run in a persistent osascript worker. If the worker cannot be
+    started or breaks, a separate osascript process runs the script,
+    precompiled to a cached .scpt when possible.
+
     Args:
         script: AppleScript code to execute
 
     Returns:
         Script output as string, or None if execution failed
     """
+    worker = _OSAWorker.instance()
+    if worker.available:
+        try:
+            return worker.send(script)
+        except TimeoutError:
+            logger.warning("AppleScript execution timed out")
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            logger.debug(f"osascript worker failed, running script directly: {e}")
+
+    compiled = _compiled_script(script)
+    command = ["osascript", str(compiled)] if compiled else ["osascript", "-e", script]
     try:
         result = subprocess.run(
-            ["osascript", "-e", script],
+            command,
             capture_output=True,
             text=True,
             timeout=5
         )
         if result.returncode == 0:
-            return result.stdout.strip()
+            # Only the newline osascript appends: CONTEXT_SEPARATOR counts as
+            # whitespace, and an empty first field must keep its separator
+            return result.stdout.rstrip("\n")
         else:
             logger.debug(f"AppleScript error: {result.stderr.strip()}")
             return None
@@ -39,6 +281,76 @@ def run_applescript(script: str) -> Optional[str]:
         return None
 
 
+def _build_context_script() -> str:
+    """Build the AppleScript used by get_active_context."""
+    url_branches = []
+    for name, url_script in CONTEXT_URL_SCRIPTS.items():
+        keyword = "if" if not url_branches else "else if"
+        escaped = url_script.replace("\\", "\\\\").replace('"', '\\"')
+        url_branches.append(
+            f'        {keyword} appName is "{name}" then\n'
+            f'            set theURL to run script "{escaped}"'
+        )
+    url_branches.append("        end if")
+
+    return """
+    set sep to character id 31
+    tell application "System Events"
+        set frontApp to first application process whose frontmost is true
+        set appId to bundle identifier of frontApp
+        if appId is missing value then set appId to ""
+        set appName to name of frontApp
+        set winTitle to ""
+        try
+            tell frontApp
+                if (count of windows) > 0 then set winTitle to name of front window
+            end tell
+        end try  -- apps that refuse window access still report their name
+        if winTitle is missing value then set winTitle to ""
+    end tell
+    set theURL to ""
+    try
+""" + "\n".join(url_branches) + """
+    end try  -- no window or tab leaves theURL empty
+    if theURL is missing value then set theURL to ""
+    return appId & sep & appName & sep & winTitle & sep & theURL
+    """
+
+
+_CONTEXT_SCRIPT = _build_context_script()
+
+
+def get_active_context() -> dict:
+    """
+    Get the active app, window title and browser URL with one osascript call.
+
+    Results are shared for CONTEXT_TTL seconds, so the single-purpose getters
+    below can be called back to back without spawning another process.
+
+    Returns:
+        Dict with "app" (bundle identifier), "name", "title" and "url";
+        values are None when unavailable
+    """
+    global _last_context, _last_context_at
+
+    now = time.monotonic()
+    if _last_context is not None and now - _last_context_at < CONTEXT_TTL:
+        return _last_context
+
+    fields = [None, None, None, None]
+    result = run_applescript(_CONTEXT_SCRIPT)
+    if result is not None:
+        parts = result.split(CONTEXT_SEPARATOR, 3)
+        fields[:len(parts)] = [part or None for part in parts]
+        if fields[1]:
+            fields[1] = sys.intern(fields[1])  # App names recur on every sample
+
+    _last_context = dict(zip(("app", "name", "title", "url"), fields))
+    # Stamped after the call: the script itself can take longer than CONTEXT_TTL
+    _last_context_at = time.monotonic()
+    return _last_context
+
+
 def get_active_app() -> Optional[str]:
     """
     Get the bundle identifier of the currently active application.
@@ -46,13 +358,7 @@ def get_active_app() -> Optional[str]:
     Returns:
         Bundle identifier string (e.g., "com.google.Chrome") or None
     """
-    script = '''
-    tell application "System Events"
-        set frontApp to first application process whose frontmost is true
-        return bundle identifier of frontApp
-    end tell
-    '''
-    return run_applescript(script)
+    return get_active_context()["app"]
 
 
 def get_active_app_name() -> Optional[str]:
@@ -62,13 +368,7 @@ def get_active_app_name() -> Optional[str]:
     Returns:
         Application name (e.g., "Google Chrome") or None
     """
-    script = '''
-    tell application "System Events"
-        set frontApp to first application process whose frontmost is true
-        return name of frontApp
-    end tell
-    '''
-    return run_applescript(script)
+    return get_active_context()["name"]
 
 
 def get_active_window_title() -> Optional[str]:
@@ -78,20 +378,7 @@ def get_active_window_title() -> Optional[str]:
     Returns:
         Window title string or None
     """
-    script = '''
-    tell application "System Events"
-        set frontApp to first application process whose frontmost is true
-        tell frontApp
-            if (count of windows) > 0 then
-                return name of front window
-            else
-                return ""
-            end if
-        end tell
-    end tell
-    '''
-    result = run_applescript(script)
-    return result if result else None
+    return get_active_context()["title"]
 
 
 def get_chrome_url() -> Optional[str]:
@@ -171,6 +458,20 @@ def get_firefox_url() -> Optional[str]:
     return None
 
 
+BROWSER_HANDLERS = {
+    "Google Chrome": get_chrome_url,
+    "Chrome": get_chrome_url,
+    "Safari": get_safari_url,
+    "Arc": get_arc_url,
+    "Firefox": get_firefox_url,
+}
+
+BROWSERS = frozenset({
+    "Google Chrome", "Chrome", "Safari", "Arc",
+    "Firefox", "Microsoft Edge", "Brave Browser", "Opera",
+})
+
+
 def get_browser_url(app_name: str) -> Optional[str]:
     """
     Get the current URL for supported browsers.
@@ -181,15 +482,13 @@ def get_browser_url(app_name: str) -> Optional[str]:
     Returns:
         URL string or None if not a supported browser or URL unavailable
     """
-    browser_handlers = {
-        "Google Chrome": get_chrome_url,
-        "Chrome": get_chrome_url,
-        "Safari": get_safari_url,
-        "Arc": get_arc_url,
-        "Firefox": get_firefox_url,
-    }
+    # The fused context already fetched the frontmost browser's URL
+    if app_name in CONTEXT_URL_SCRIPTS:
+        context = get_active_context()
+        if context["name"] == app_name:
+            return context["url"]
 
-    handler = browser_handlers.get(app_name)
+    handler = BROWSER_HANDLERS.get(app_name)
     if handler:
         return handler()
     return None
@@ -205,32 +504,39 @@ def is_browser(app_name: str) -> bool:
     Returns:
         True if the application is a recognized browser
     """
-    browsers = {
-        "Google Chrome", "Chrome", "Safari", "Arc",
-        "Firefox", "Microsoft Edge", "Brave Browser", "Opera"
-    }
-    return app_name in browsers
+    return app_name in BROWSERS
 
 
 def get_all_apps_with_windows() -> list[str]:
     """
     Get list of all foreground applications (apps with UI windows).
-    Uses lsappinfo for speed (~30ms vs ~2500ms with AppleScript).
+    Uses lsappinfo for speed (~30ms vs ~2500ms with AppleScript), parsing
+    its output here rather than through a shell and awk.
 
     Returns:
         List of application names with visible windows
     """
     try:
         result = subprocess.run(
-            ["bash", "-c",
-             "lsappinfo list | awk -F'\"' '/^[[:space:]]*[0-9]+\\)/{name=$2} /type=\"Foreground\"/{print name}'"],
+            ["lsappinfo", "list"],
             capture_output=True,
             text=True,
             timeout=2
         )
-        if result.returncode == 0 and result.stdout:
-            apps = [app.strip() for app in result.stdout.strip().split("\n") if app.strip()]
-            return apps
     except Exception as e:
         logger.debug(f"Failed to get app list: {e}")
-    return []
+        return []
+    if result.returncode != 0:
+        return []
+
+    apps = []
+    name = ""
+    for line in result.stdout.splitlines():
+        # Each record starts with its quoted name, followed by its attributes
+        if _LSAPPINFO_HEADER_RE.match(line):
+            parts = line.split('"', 2)
+            # Interned so comparisons against the focused app hit the identity fast path
+            name = sys.intern(parts[1].strip()) if len(parts) > 1 else ""
+        if 'type="Foreground"' in line and name:
+            apps.append(name)
+    return apps